@@ -2,7 +2,17 @@
 from django.contrib import admin
 from guardian.admin import GuardedModelAdmin
 
-from .models import Evaluation, Experiment, Frame, Project, Scan, ScanDecision
+from .models import (
+    Evaluation,
+    EvaluationRun,
+    Experiment,
+    Frame,
+    ImportExportJob,
+    Project,
+    ReviewProgress,
+    Scan,
+    ScanDecision,
+)
 
 
 @admin.register(Experiment)
@@ -22,8 +32,16 @@ class FrameAdmin(admin.ModelAdmin):
 
 @admin.register(Scan)
 class ScanAdmin(admin.ModelAdmin):
-    list_display = ('id', 'created', 'modified', 'experiment', 'name', 'scan_type')
-    list_filter = ('created', 'modified')
+    list_display = (
+        'id',
+        'created',
+        'modified',
+        'experiment',
+        'name',
+        'scan_type',
+        'latest_decision_code',
+    )
+    list_filter = ('created', 'modified', 'latest_decision_code')
 
 
 @admin.register(ScanDecision)
@@ -38,6 +56,28 @@ class EvaluationAdmin(admin.ModelAdmin):
     list_filter = ('frame', 'evaluation_model')
 
 
+@admin.register(EvaluationRun)
+class EvaluationRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'created',
+        'completed',
+        'project',
+        'job',
+        'completed_chunks',
+        'total_chunks',
+        'evaluated_frames',
+        'total_frames',
+    )
+    list_filter = ('created', 'completed')
+
+
+@admin.register(ImportExportJob)
+class ImportExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created', 'kind', 'project', 'creator', 'state', 'processed', 'total')
+    list_filter = ('created', 'kind', 'state', 'project')
+
+
 @admin.register(Project)
 class ProjectAdmin(GuardedModelAdmin):
     list_display = (
@@ -52,3 +92,17 @@ class ProjectAdmin(GuardedModelAdmin):
     )
     list_filter = ('created', 'modified', 'creator')
     search_fields = ('name',)
+
+
+@admin.register(ReviewProgress)
+class ReviewProgressAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'project',
+        'experiment',
+        'total_scans',
+        'complete',
+        'needs_tier_2_review',
+        'unreviewed',
+    )
+    list_filter = ('project',)
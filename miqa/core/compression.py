@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+import gzip
+import io
+from typing import BinaryIO, Iterator, Optional, TextIO, Tuple, Type
+
+from rest_framework.exceptions import APIException
+
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def split_compression(path: str) -> Tuple[str, Optional[str]]:
+    """Split a path like `export.csv.gz` into the uncompressed path and the compression used."""
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(extension):
+            return path[: -len(extension)], compression
+    return path, None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise APIException('Reading and writing .zst files requires the zstandard package.')
+    return zstandard
+
+
+def decompression_errors() -> Tuple[Type[Exception], ...]:
+    """The exceptions raised while reading a truncated or corrupt compressed file."""
+    try:
+        import zstandard
+    except ImportError:
+        return (EOFError, gzip.BadGzipFile)
+    return (EOFError, gzip.BadGzipFile, zstandard.ZstdError)
+
+
+@contextmanager
+def open_text(fileobj: BinaryIO, path: str, mode: str = 'r') -> Iterator[TextIO]:
+    """
+    Open a binary file as text, compressing or decompressing it according to the extension of path.
+
+    Leaving the context finishes the compressed stream, but leaves `fileobj` itself open, so the
+    caller can still e.g. complete an upload.
+    """
+    _, compression = split_compression(path)
+    stream: BinaryIO = fileobj
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=fileobj, mode=f'{mode}b')
+    elif compression == 'zstd':
+        zstandard = _zstandard()
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    text = io.TextIOWrapper(stream, encoding='utf-8')
+    try:
+        yield text
+    finally:
+        # flush the text without closing the file underneath it
+        text.detach()
+        if stream is not fileobj:
+            stream.close()
@@ -1,12 +1,27 @@
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+import os
 from pathlib import Path
-from typing import List, Optional as TypingOptional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional as TypingOptional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from botocore.exceptions import ClientError
+from django.conf import settings
 import pandas
 from rest_framework.exceptions import APIException
-from schema import Optional, Or, Schema, SchemaError, Use
 
 from miqa.core.models import GlobalSettings, Project
+from miqa.core.s3 import get_s3_client, split_s3_path
 
 # subjectid and sessionid are for compatibility with PREDICT and other BidS datasets
 
@@ -30,86 +45,280 @@ IMPORT_CSV_COLUMNS = [
 ]
 
 
-def validate_file_locations(input_dict, project, not_found_errors):
-    if not isinstance(input_dict, dict):
-        return input_dict, not_found_errors
-    import_path = GlobalSettings.load().import_path if project is None else project.import_path
-    for key, value in input_dict.items():
-        if key == 'file_location':
-            raw_path = Path(value.strip())
-            if not value.startswith('s3://'):
-                if not raw_path.is_absolute():
-                    # not an absolute file path; refer to project import csv location
-                    raw_path = Path(import_path).parent.parent / raw_path
-                if not raw_path.exists():
-                    not_found_errors.append(f'File not found: {raw_path}')
-            input_dict[key] = str(raw_path) if value and 's3://' not in value else value
-        else:
-            new_value, not_found_errors = validate_file_locations(value, project, not_found_errors)
-            input_dict[key] = new_value
-    return input_dict, not_found_errors
+class _ValidationContext:
+    def __init__(self, import_root: Path):
+        # relative file locations are relative to this directory
+        self.import_root = import_root
+        self.errors: List[str] = []
+        # file locations are checked together once the whole dict is validated
+        self.file_locations: List[Union[Path, str]] = []
 
 
-def validate_import_dict(import_dict, project: TypingOptional[Project]):
-    import_schema = Schema(
-        {
-            'projects': {
-                Optional(Use(str)): {
-                    'experiments': {
-                        Optional(Use(str)): {
-                            Optional('notes'): Optional(str, None),
-                            'scans': {
-                                Optional(Use(str)): {
-                                    'type': Use(str),
-                                    Optional('subject_id'): Or(str, None),
-                                    Optional('session_id'): Or(str, None),
-                                    Optional('scan_link'): Or(str, None),
-                                    'frames': {Use(int): {'file_location': Use(str)}},
-                                    Optional('decisions'): [
+# A validator checks and normalizes a value found at `path` in an import dict, recording problems
+# in the context instead of stopping at the first one.
+Validator = Callable[[Any, str, _ValidationContext], Any]
+
+
+def _child(path: str, key) -> str:
+    return f'{path}/{key}' if path else str(key)
+
+
+def _check_type(value, value_type: type, path: str, context: _ValidationContext) -> bool:
+    if isinstance(value, value_type):
+        return True
+    context.errors.append(f'{path}: {value!r} should be instance of {value_type.__name__!r}')
+    return False
+
+
+def _instance_of(value_type: type) -> Validator:
+    def validate(value, path, context):
+        _check_type(value, value_type, path, context)
+        return value
+
+    return validate
+
+
+def _use(function: Callable[[Any], Any]) -> Validator:
+    def validate(value, path, context):
+        try:
+            return function(value)
+        except (TypeError, ValueError):
+            context.errors.append(f'{path}: invalid value {value!r}')
+            return value
+
+    return validate
+
+
+def _nullable(validator: Validator) -> Validator:
+    def validate(value, path, context):
+        return None if value is None else validator(value, path, context)
+
+    return validate
+
+
+def _record(required: Dict[str, Validator], optional: Dict[str, Validator] = None) -> Validator:
+    """Validate a dict with fixed keys, some of which may be missing."""
+    fields = {**required, **(optional or {})}
+
+    def validate(value, path, context):
+        if not _check_type(value, dict, path, context):
+            return value
+        missing = [key for key in required if key not in value]
+        if missing:
+            context.errors.append(f'{path}: missing keys {", ".join(map(repr, missing))}')
+        normalized = {}
+        for key, item in value.items():
+            if key in fields:
+                normalized[key] = fields[key](item, _child(path, key), context)
+            else:
+                context.errors.append(f'{path}: wrong key {key!r}')
+        return normalized
+
+    return validate
+
+
+def _mapping(key: Validator, item: Validator, allow_empty: bool = True) -> Validator:
+    """Validate a dict with arbitrary keys, e.g. experiments by name."""
+
+    def validate(value, path, context):
+        if not _check_type(value, dict, path, context):
+            return value
+        if not value and not allow_empty:
+            context.errors.append(f'{path}: must not be empty')
+        normalized = {}
+        for item_key, item_value in value.items():
+            item_path = _child(path, item_key)
+            normalized[key(item_key, item_path, context)] = item(item_value, item_path, context)
+        return normalized
+
+    return validate
+
+
+def _list_of(item: Validator) -> Validator:
+    def validate(value, path, context):
+        if not _check_type(value, list, path, context):
+            return value
+        return [
+            item(item_value, _child(path, index), context) for index, item_value in enumerate(value)
+        ]
+
+    return validate
+
+
+def _frame_number(value, path, context):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        context.errors.append(f'{path}: invalid frame number {value!r}, must be an integer')
+        return value
+
+
+def _file_location(value, path, context):
+    """Resolve a file location relative to the import file, and check that the file exists."""
+    value = str(value)
+    if not value:
+        return value
+    if value.startswith('s3://'):
+        context.file_locations.append(value)
+        return value
+    raw_path = Path(value.strip())
+    if not raw_path.is_absolute():
+        # not an absolute file path; refer to project import csv location
+        raw_path = context.import_root / raw_path
+    context.file_locations.append(raw_path)
+    return str(raw_path)
+
+
+def _missing_in_directory(directory: Path, names: Set[str]) -> Set[str]:
+    try:
+        # one directory listing is much cheaper than a stat per file on network file systems
+        with os.scandir(directory) as entries:
+            return names - {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return names
+    except OSError:
+        # e.g. a directory which may be traversed but not listed
+        return {name for name in names if not (directory / name).exists()}
+
+
+def _missing_in_s3_prefix(bucket: str, prefix: str, keys: Set[str], public: bool) -> Set[str]:
+    client = get_s3_client(public)
+    if len(keys) == 1:
+        (key,) = keys
+        try:
+            client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ['404', 'NoSuchKey']:
+                return keys
+        return set()
+    missing = set(keys)
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+        missing -= {obj['Key'] for obj in page.get('Contents', [])}
+    return missing
+
+
+def find_missing_files(file_locations: Iterable[Union[Path, str]], s3_public: bool = False):
+    """
+    Return the given local paths and `s3://` locations which do not exist.
+
+    Files are grouped by directory (or S3 prefix), each of which is listed once, and the
+    directories are checked concurrently. S3 locations are only checked if IMPORT_CHECK_S3_FILES
+    is enabled.
+    """
+    directories: Dict[Path, Set[str]] = defaultdict(set)
+    prefixes: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+    for location in file_locations:
+        if isinstance(location, Path):
+            directories[location.parent].add(location.name)
+        elif settings.IMPORT_CHECK_S3_FILES:
+            bucket, key = split_s3_path(location)
+            prefixes[bucket, key[: key.rfind('/') + 1]].add(key)
+
+    with ThreadPoolExecutor(max_workers=settings.IMPORT_FILE_CHECK_WORKERS) as executor:
+        missing_files = executor.map(lambda item: _missing_in_directory(*item), directories.items())
+        missing_objects = executor.map(
+            lambda item: _missing_in_s3_prefix(*item[0], item[1], s3_public), prefixes.items()
+        )
+        missing: Set[Union[Path, str]] = {
+            directory / name
+            for directory, names in zip(directories, missing_files)
+            for name in names
+        }
+        missing.update(
+            f's3://{bucket}/{key}'
+            for (bucket, _), keys in zip(prefixes, missing_objects)
+            for key in keys
+        )
+    return missing
+
+
+_optional_str = _nullable(_instance_of(str))
+_decision_validator = _record(
+    {
+        'decision': _use(str),
+        'creator': _optional_str,
+        'note': _optional_str,
+        'created': _optional_str,
+        'user_identified_artifacts': _optional_str,
+        'location': _optional_str,
+    }
+)
+# built once, since validating large imports is hot
+import_validator = _record(
+    {
+        'projects': _mapping(
+            _use(str),
+            _record(
+                {
+                    'experiments': _mapping(
+                        _use(str),
+                        _record(
+                            {
+                                'scans': _mapping(
+                                    _use(str),
+                                    _record(
                                         {
-                                            'decision': Use(str),
-                                            'creator': Or(str, None),
-                                            'note': Or(str, None),
-                                            'created': Or(str, None),
-                                            'user_identified_artifacts': Or(str, None),
-                                            'location': Or(str, None),
+                                            'type': _use(str),
+                                            'frames': _mapping(
+                                                _frame_number,
+                                                _record({'file_location': _file_location}),
+                                                allow_empty=False,
+                                            ),
                                         },
-                                    ],
-                                    Optional('last_decision'): Or(
-                                        {
-                                            'decision': Use(str),
-                                            'creator': Or(str, None),
-                                            'note': Or(str, None),
-                                            'created': Or(str, None),
-                                            'user_identified_artifacts': Or(str, None),
-                                            'location': Or(str, None),
+                                        optional={
+                                            'subject_id': _optional_str,
+                                            'session_id': _optional_str,
+                                            'scan_link': _optional_str,
+                                            'decisions': _list_of(_decision_validator),
+                                            'last_decision': _nullable(_decision_validator),
                                         },
-                                        None,
                                     ),
-                                }
+                                )
                             },
-                        }
-                    }
+                            optional={'notes': _instance_of(str)},
+                        ),
+                    )
                 }
-            }
-        }
-    )
-    not_found_errors: List[str] = []
-    try:
-        import_schema.validate(import_dict)
-        import_dict, not_found_errors = validate_file_locations(
-            import_dict, project, not_found_errors
+            ),
+        )
+    }
+)
+
+
+def validate_import_dict(import_dict, project: TypingOptional[Project]):
+    """
+    Validate and normalize an import dict in a single pass.
+
+    Returns the normalized dict, with integer frame numbers and file locations resolved relative
+    to the import file, and the list of files which do not exist. All format errors are reported
+    together, with their location in the dict.
+    """
+    import_path = GlobalSettings.load().import_path if project is None else project.import_path
+    context = _ValidationContext(Path(import_path).parent.parent)
+    import_dict = import_validator(import_dict, '', context)
+    if context.errors:
+        raise APIException(
+            f'Invalid format of import file {import_path}. {"; ".join(context.errors)}.'
         )
-    except SchemaError as e:
-        import_path = GlobalSettings.load().import_path if project is None else project.import_path
-        raise APIException(f'Invalid format of import file {import_path}. {e.autos[-1]}.')
     if not project:
         for project_name in import_dict['projects']:
             if not Project.objects.filter(name=project_name).exists():
                 raise APIException(f'Project {project_name} does not exist')
+
+    missing = find_missing_files(context.file_locations, project.s3_public if project else False)
+    not_found_errors = [
+        f'File not found: {location}' for location in context.file_locations if location in missing
+    ]
     return import_dict, not_found_errors
 
 
+def _group_rows(rows, values):
+    """Group consecutive row indices which have the same value."""
+    for value, group in groupby(rows, key=values.__getitem__):
+        yield value, list(group)
+
+
 def import_dataframe_to_dict(df, project):
     df_columns = list(df.columns)
     # The columns after the first 6 are optional
@@ -120,30 +329,40 @@ def import_dataframe_to_dict(df, project):
             'Import file has invalid columns. '
             f'Expected {IMPORT_CSV_COLUMNS}, received {df_columns}.'
         )
+    # Work on plain lists of column values, and sort the rows once (keeping the file order within
+    # each scan), so every project, experiment and scan is a contiguous range of rows.
+    columns = {column: df[column].tolist() for column in df_columns}
+    keys = list(zip(columns['project_name'], columns['experiment_name'], columns['scan_name']))
+    rows = sorted(range(len(keys)), key=keys.__getitem__)
+
     ingest_dict = {'projects': {}}
-    for project_name, project_df in df.groupby('project_name'):
+    for project_name, project_rows in _group_rows(rows, columns['project_name']):
         if project and project_name != project.name:
             raise APIException(
                 f'Import file contains rows for project "{project_name}, " \
                 which does not match "{project.name}." Import failed.'
             )
         project_dict = {'experiments': {}}
-        if list(project_df['experiment_name'].unique()) != ['']:
-            for experiment_name, experiment_df in project_df.groupby('experiment_name'):
+        if any(columns['experiment_name'][row] != '' for row in project_rows):
+            for experiment_name, experiment_rows in _group_rows(
+                project_rows, columns['experiment_name']
+            ):
                 experiment_dict = {'scans': {}}
-                if 'experiment_notes' in experiment_df.columns:
-                    experiment_dict['notes'] = experiment_df['experiment_notes'].iloc[0]
-                for scan_name, scan_df in experiment_df.groupby('scan_name'):
+                if 'experiment_notes' in columns:
+                    # notes are read from the first row of the experiment in the file
+                    experiment_dict['notes'] = columns['experiment_notes'][min(experiment_rows)]
+                for scan_name, scan_rows in _group_rows(experiment_rows, columns['scan_name']):
+                    first = scan_rows[0]
                     scan_dict = {}
-                    if list(scan_df['file_location'].unique()) != ['']:
+                    if any(columns['file_location'][row] != '' for row in scan_rows):
                         try:
                             scan_dict = {
-                                'type': scan_df['scan_type'].iloc[0],
+                                'type': columns['scan_type'][first],
                                 'frames': {
-                                    int(row[1]['frame_number']): {
-                                        'file_location': row[1]['file_location']
+                                    int(columns['frame_number'][row]): {
+                                        'file_location': columns['file_location'][row]
                                     }
-                                    for row in scan_df.iterrows()
+                                    for row in scan_rows
                                 },
                                 'decisions': [],
                             }
@@ -152,32 +371,32 @@ def import_dataframe_to_dict(df, project):
                                 f'Invalid frame number {str(e).split(":")[-1]}.'
                                 f' Must be an integer value.'
                             )
-                        if 'subject_id' in scan_df.columns:
-                            scan_dict['subject_id'] = scan_df['subject_id'].iloc[0]
-                        if 'session_id' in scan_df.columns:
-                            scan_dict['session_id'] = scan_df['session_id'].iloc[0]
-                        if 'scan_link' in scan_df.columns:
-                            scan_dict['scan_link'] = scan_df['scan_link'].iloc[0]
-                        if 'last_decision' in scan_df.columns and scan_df['last_decision'].iloc[0]:
+                        if 'subject_id' in columns:
+                            scan_dict['subject_id'] = columns['subject_id'][first]
+                        if 'session_id' in columns:
+                            scan_dict['session_id'] = columns['session_id'][first]
+                        if 'scan_link' in columns:
+                            scan_dict['scan_link'] = columns['scan_link'][first]
+                        if 'last_decision' in columns and columns['last_decision'][first]:
                             decision_dict = {
-                                'decision': scan_df['last_decision'].iloc[0],
-                                'creator': scan_df['last_decision_creator'].iloc[0],
-                                'note': scan_df['last_decision_note'].iloc[0],
-                                'created': str(scan_df['last_decision_created'].iloc[0])
-                                if scan_df['last_decision_created'].iloc[0]
+                                'decision': columns['last_decision'][first],
+                                'creator': columns['last_decision_creator'][first],
+                                'note': columns['last_decision_note'][first],
+                                'created': str(columns['last_decision_created'][first])
+                                if columns['last_decision_created'][first]
                                 else None,
-                                'user_identified_artifacts': scan_df['identified_artifacts'].iloc[0]
+                                'user_identified_artifacts': columns['identified_artifacts'][first]
                                 or None,
-                                'location': scan_df['location_of_interest'].iloc[0] or None,
+                                'location': columns['location_of_interest'][first] or None,
                             }
                             decision_dict = {k: (v or None) for k, v in decision_dict.items()}
                             scan_dict['decisions'].append(decision_dict)
 
                         # added for BIDS import
-                        if 'subject_ID' in scan_df.columns:
-                            scan_dict['subject_ID'] = scan_df['subject_ID'].iloc[0]
-                        if 'session_ID' in scan_df.columns:
-                            scan_dict['session_ID'] = scan_df['session_ID'].iloc[0]
+                        if 'subject_ID' in columns:
+                            scan_dict['subject_ID'] = columns['subject_ID'][first]
+                        if 'session_ID' in columns:
+                            scan_dict['session_ID'] = columns['session_ID'][first]
                         # ---- end of BIDS support addition
 
                         experiment_dict['scans'][scan_name] = scan_dict
@@ -204,26 +423,21 @@ def import_dict_to_dataframe(data):
                         scan_data.get('session_id', ''),
                         scan_data.get('scan_link', ''),
                     ]
-                    sorted_decisions = sorted(
+                    # timestamps like 2022-01-31 12:00:00 sort in chronological order as text
+                    last_decision_data = max(
                         scan_data.get('decisions', []),
-                        key=lambda d: datetime.strptime(
-                            d['created'].split('+')[0], '%Y-%m-%d %H:%M:%S'
-                        ),
-                        reverse=True,
+                        key=lambda d: (d.get('created') or '').split('+')[0],
+                        default=None,
                     )
-                    if len(sorted_decisions) > 0:
-                        last_decision_data = sorted_decisions[0]
-                        if last_decision_data:
-                            row += [
-                                last_decision_data.get('decision', ''),
-                                last_decision_data.get('creator', ''),
-                                last_decision_data.get('note', ''),
-                                last_decision_data.get('created', ''),
-                                last_decision_data.get('user_identified_artifacts', ''),
-                                last_decision_data.get('location', ''),
-                            ]
-                        else:
-                            row += ['' for i in range(6)]
+                    if last_decision_data:
+                        row += [
+                            last_decision_data.get('decision', ''),
+                            last_decision_data.get('creator', ''),
+                            last_decision_data.get('note', ''),
+                            last_decision_data.get('created', ''),
+                            last_decision_data.get('user_identified_artifacts', ''),
+                            last_decision_data.get('location', ''),
+                        ]
                     else:
                         row += ['' for i in range(6)]
                     row_data.append(row)
@@ -0,0 +1,116 @@
+from collections import Counter
+from contextlib import contextmanager
+from hashlib import sha256
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+
+class FileCache:
+    """
+    Size-capped on-disk cache of remote files.
+
+    Files are stored under a hash of their cache key, which should identify the content (e.g. the
+    S3 bucket, key and ETag), so a changed remote file is simply stored as a new entry. The
+    modification time of a file records when it was last used, and the least recently used files
+    are evicted once the cache grows beyond `max_size` bytes.
+
+    Files used within the last `grace_period` seconds, or held by this process (see `holding`),
+    are never evicted, even if that leaves the cache over `max_size` for a while.
+    """
+
+    partial_suffix = '.partial'
+
+    def __init__(self, directory: Path, max_size: int, grace_period: float = 10 * 60):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.grace_period = grace_period
+        self._lock = threading.Lock()
+        # the size of the cache is scanned once, then tracked as files are added and evicted;
+        # files added by other processes are only counted once an eviction scans the directory
+        self._size: Optional[int] = None
+        self._held: Counter = Counter()
+
+    def path_for(self, key: str, suffix: str = '') -> Path:
+        return self.directory / f'{sha256(key.encode()).hexdigest()}{suffix}'
+
+    def get(self, key: str, fetch: Callable[[Path], None], suffix: str = '') -> Path:
+        """
+        Return the local path of the cached file, calling `fetch(path)` to create it on a miss.
+
+        `suffix` is appended to the cached file name, so readers which rely on the file extension
+        (e.g. `.nii.gz`) still work on the cached copy.
+        """
+        path = self.path_for(key, suffix)
+        try:
+            # mark the file as recently used
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # fetch into a private file first, so concurrent readers never see a partial download
+        fd, partial_path = tempfile.mkstemp(dir=self.directory, suffix=self.partial_suffix)
+        os.close(fd)
+        try:
+            fetch(Path(partial_path))
+            size = os.stat(partial_path).st_size
+            os.replace(partial_path, path)
+        finally:
+            Path(partial_path).unlink(missing_ok=True)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            over_budget = self._size is None or self._size > self.max_size
+        if over_budget:
+            self.evict()
+        return path
+
+    @contextmanager
+    def holding(self) -> Iterator[Callable[[Path], Path]]:
+        """
+        Protect files from eviction until the block exits.
+
+        Yields a function which holds a path returned by `get` and returns it, e.g.
+        `hold(cache.get(key, fetch))`. It may be called from any thread.
+        """
+        held = []
+
+        def hold(path: Path) -> Path:
+            with self._lock:
+                self._held[path] += 1
+                held.append(path)
+            return path
+
+        try:
+            yield hold
+        finally:
+            with self._lock:
+                self._held.subtract(held)
+                self._held += Counter()  # drop paths which are no longer held
+
+    def evict(self) -> None:
+        """Delete least recently used files until the cache fits in `max_size` bytes."""
+        with self._lock:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith(self.partial_suffix):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+            total_size = sum(size for _, size, _ in entries)
+            recently_used = time.time() - self.grace_period
+            for mtime, size, path in sorted(entries):
+                if total_size <= self.max_size or mtime > recently_used:
+                    break
+                if path in self._held:
+                    continue
+                path.unlink(missing_ok=True)
+                total_size -= size
+            self._size = total_size
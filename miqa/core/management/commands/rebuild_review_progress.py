@@ -0,0 +1,24 @@
+import djclick as click
+
+from miqa.core.models import Project, ReviewProgress, Scan
+
+
+# recompute the latest decisions of scans and the review progress counters,
+# e.g. after editing decisions in the admin console
+@click.option(
+    '--project',
+    'project_names',
+    type=click.STRING,
+    multiple=True,
+    help='name of a project to rebuild; all projects by default',
+)
+@click.command()
+def command(project_names):
+    projects = Project.objects.order_by('name')
+    if project_names:
+        projects = projects.filter(name__in=project_names)
+
+    for project in projects:
+        Scan.update_latest_decisions(Scan.objects.filter(experiment__project=project))
+        progress = ReviewProgress.update(project)
+        click.echo(f'{project.name}: {progress.complete}/{progress.total_scans} scans complete.')
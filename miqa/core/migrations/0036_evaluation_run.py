@@ -0,0 +1,47 @@
+# Generated by Django 3.2.13 on 2026-10-17 12:00
+
+import uuid
+
+from django.db import migrations, models
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0035_allow_null_decision_creation_times'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationRun',
+            fields=[
+                (
+                    'created',
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name='created'
+                    ),
+                ),
+                (
+                    'modified',
+                    django_extensions.db.fields.ModificationDateTimeField(
+                        auto_now=True, verbose_name='modified'
+                    ),
+                ),
+                (
+                    'id',
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ('total_chunks', models.PositiveIntegerField()),
+                ('completed_chunks', models.PositiveIntegerField(default=0)),
+                ('total_frames', models.PositiveIntegerField()),
+                ('evaluated_frames', models.PositiveIntegerField(default=0)),
+                ('completed', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
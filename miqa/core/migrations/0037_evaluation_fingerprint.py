@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0036_evaluation_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluation',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
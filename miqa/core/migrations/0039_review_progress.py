@@ -0,0 +1,129 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:53
+
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+import django.db.models.deletion
+
+PROGRESS_FIELDS = ['total_scans', 'complete', 'needs_tier_2_review', 'unreviewed']
+
+
+def create_review_progress(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor):
+    # the same counts as ReviewProgress.update, which needs fields added by later migrations
+    Project = apps.get_model('core', 'Project')  # noqa: N806
+    Experiment = apps.get_model('core', 'Experiment')  # noqa: N806
+    Scan = apps.get_model('core', 'Scan')  # noqa: N806
+    ScanDecision = apps.get_model('core', 'ScanDecision')  # noqa: N806
+    ReviewProgress = apps.get_model('core', 'ReviewProgress')  # noqa: N806
+    UserObjectPermission = apps.get_model('guardian', 'UserObjectPermission')  # noqa: N806
+
+    latest_decisions = ScanDecision.objects.filter(scan=models.OuterRef('id')).order_by(
+        models.F('created').desc(nulls_last=True)
+    )
+    for project in Project.objects.all():
+        # project permissions are only ever granted to users, not groups
+        tier_2_reviewers = UserObjectPermission.objects.filter(
+            content_type__app_label='core',
+            content_type__model='project',
+            object_pk=str(project.id),
+            permission__codename='tier_2_reviewer',
+        ).values('user_id')
+        counts = {
+            row['experiment_id']: row
+            for row in Scan.objects.filter(experiment__project=project)
+            .annotate(
+                decision_code=models.Subquery(latest_decisions.values('decision')[:1]),
+                decision_creator=models.Subquery(latest_decisions.values('creator')[:1]),
+            )
+            .order_by()
+            .values('experiment_id')
+            .annotate(
+                total_scans=models.Count('id'),
+                complete=models.Count(
+                    'id',
+                    filter=models.Q(decision_code='U')
+                    | models.Q(decision_creator__in=tier_2_reviewers),
+                ),
+                unreviewed=models.Count('id', filter=models.Q(decision_code=None)),
+            )
+        }
+
+        project_progress = ReviewProgress(project=project)
+        experiment_progress = []
+        for experiment_id in Experiment.objects.filter(project=project).values_list(
+            'id', flat=True
+        ):
+            row = counts.get(experiment_id, {})
+            progress = ReviewProgress(
+                project=project,
+                experiment_id=experiment_id,
+                total_scans=row.get('total_scans', 0),
+                complete=row.get('complete', 0),
+                unreviewed=row.get('unreviewed', 0),
+            )
+            progress.needs_tier_2_review = (
+                progress.total_scans - progress.complete - progress.unreviewed
+            )
+            experiment_progress.append(progress)
+            for field in PROGRESS_FIELDS:
+                setattr(
+                    project_progress,
+                    field,
+                    getattr(project_progress, field) + getattr(progress, field),
+                )
+        ReviewProgress.objects.bulk_create([project_progress, *experiment_progress])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0038_import_export_job'),
+        ('guardian', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewProgress',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('total_scans', models.PositiveIntegerField(default=0)),
+                ('complete', models.PositiveIntegerField(default=0)),
+                ('needs_tier_2_review', models.PositiveIntegerField(default=0)),
+                ('unreviewed', models.PositiveIntegerField(default=0)),
+                (
+                    'experiment',
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='review_progress',
+                        to='core.experiment',
+                    ),
+                ),
+                (
+                    'project',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='review_progress',
+                        to='core.project',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name_plural': 'review progress',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewprogress',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('experiment', None)),
+                fields=('project',),
+                name='review_progress_project_unique',
+            ),
+        ),
+        migrations.RunPython(create_review_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def set_latest_decisions(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor):
+    Scan = apps.get_model('core', 'Scan')  # noqa: N806
+    ScanDecision = apps.get_model('core', 'ScanDecision')  # noqa: N806
+
+    latest_decisions = ScanDecision.objects.filter(scan=models.OuterRef('id')).order_by(
+        models.F('created').desc(nulls_last=True)
+    )
+    Scan.objects.update(
+        latest_decision=models.Subquery(latest_decisions.values('id')[:1]),
+        latest_decision_code=Coalesce(
+            models.Subquery(latest_decisions.values('decision')[:1]), models.Value('')
+        ),
+        latest_decision_creator=models.Subquery(latest_decisions.values('creator')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0039_review_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='latest_decision',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='core.scandecision',
+            ),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='latest_decision_code',
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ('U', 'Usable'),
+                    ('UE', 'Usable-Extra'),
+                    ('Q?', 'Questionable'),
+                    ('UN', 'Unusable'),
+                ],
+                max_length=2,
+            ),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='latest_decision_creator',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='scan',
+            index=models.Index(
+                fields=['experiment', 'latest_decision_code'], name='core_scan_experim_2d75ca_idx'
+            ),
+        ),
+        migrations.RunPython(set_latest_decisions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0040_scan_latest_decision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluationrun',
+            name='job',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='evaluation_runs',
+                to='core.importexportjob',
+            ),
+        ),
+        migrations.AddField(
+            model_name='evaluationrun',
+            name='project',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='evaluation_runs',
+                to='core.project',
+            ),
+        ),
+    ]
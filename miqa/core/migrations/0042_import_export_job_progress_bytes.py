@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0041_evaluation_run_project_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importexportjob',
+            name='processed',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='importexportjob',
+            name='total',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,17 +1,22 @@
-from .evaluation import Evaluation
+from .evaluation import Evaluation, EvaluationRun
 from .experiment import Experiment
 from .frame import Frame
 from .global_settings import GlobalSettings
+from .import_export_job import ImportExportJob
 from .project import Project
+from .review_progress import ReviewProgress
 from .scan import Scan
 from .scan_decision import ScanDecision
 
 __all__ = [
     'Evaluation',
+    'EvaluationRun',
     'Experiment',
     'Frame',
     'GlobalSettings',
+    'ImportExportJob',
     'Project',
+    'ReviewProgress',
     'Scan',
     'ScanDecision',
 ]
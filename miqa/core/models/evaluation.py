@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 from django.db import models
+from django_extensions.db.models import TimeStampedModel
 
 
 class Evaluation(models.Model):
@@ -12,6 +13,38 @@ class Evaluation(models.Model):
     )
     evaluation_model = models.CharField(max_length=50)
     results = models.JSONField()
+    # hash of the frame's path, file version and evaluation model, used to reuse results
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
 
     def __str__(self):
         return f'Evaluation for {str(self.frame.raw_path)}'
+
+
+class EvaluationRun(TimeStampedModel, models.Model):
+    """Tracks the chunks of an import evaluation as they are processed by Celery workers."""
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    # the project whose frames are evaluated, unless the run spans several projects
+    project = models.ForeignKey(
+        'Project',
+        null=True,
+        blank=True,
+        related_name='evaluation_runs',
+        on_delete=models.SET_NULL,
+    )
+    # the import job whose frames are evaluated, if it was started by one
+    job = models.ForeignKey(
+        'ImportExportJob',
+        null=True,
+        blank=True,
+        related_name='evaluation_runs',
+        on_delete=models.SET_NULL,
+    )
+    total_chunks = models.PositiveIntegerField()
+    completed_chunks = models.PositiveIntegerField(default=0)
+    total_frames = models.PositiveIntegerField()
+    evaluated_frames = models.PositiveIntegerField(default=0)
+    completed = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Evaluation run {self.id} ({self.completed_chunks}/{self.total_chunks} chunks)'
@@ -5,7 +5,6 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 from uuid import uuid4
 
-import boto3
 from django.conf import settings
 from django.db import models
 from django.db.models.signals import pre_delete
@@ -14,6 +13,7 @@ from django_extensions.db.models import TimeStampedModel
 from s3_file_field.fields import S3FileField
 
 from miqa.core.conversion.nifti_to_zarr_ngff import convert_to_store_path
+from miqa.core.s3 import presigned_download_url
 
 if TYPE_CHECKING:
     from miqa.core.models import Experiment
@@ -64,11 +64,7 @@ class Frame(TimeStampedModel, models.Model):
     @property
     def s3_download_url(self) -> Optional[str]:
         if self.storage_mode == StorageMode.S3_PATH:
-            bucket, key = self.raw_path.strip()[5:].split('/', maxsplit=1)
-            client = boto3.client('s3')
-            return client.generate_presigned_url(
-                'get_object', Params={'Bucket': bucket, 'Key': key}
-            )
+            return presigned_download_url(self.raw_path)
         return None
 
 
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import time
+from typing import Iterator, Optional
+from uuid import uuid4
+
+from django.contrib.auth.models import User
+from django.db import connection, models
+from django_extensions.db.models import TimeStampedModel
+
+
+class ImportExportJob(TimeStampedModel, models.Model):
+    """An import or export of a project (or of all projects) run by a Celery worker."""
+
+    class Kind(models.TextChoices):
+        IMPORT = 'import'
+        EXPORT = 'export'
+
+    class State(models.TextChoices):
+        PENDING = 'pending'
+        RUNNING = 'running'
+        SUCCEEDED = 'succeeded'
+        FAILED = 'failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    kind = models.CharField(choices=Kind.choices, max_length=6)
+    # null for global imports and exports
+    project = models.ForeignKey(
+        'Project', null=True, blank=True, related_name='jobs', on_delete=models.CASCADE
+    )
+    creator = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    state = models.CharField(choices=State.choices, default=State.PENDING, max_length=9)
+    # progress in bytes read of an imported CSV file, otherwise in projects
+    processed = models.PositiveBigIntegerField(default=0)
+    total = models.PositiveBigIntegerField(null=True, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+    warnings = models.JSONField(default=list, blank=True)
+    # e.g. the changes made by an incremental import
+    result = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.get_kind_display()} job {self.id} ({self.state})'
+
+    @property
+    def finished(self) -> bool:
+        return self.state in [self.State.SUCCEEDED, self.State.FAILED]
+
+    # minimum number of seconds between progress updates written to the database
+    progress_interval = 1.0
+    _progress_writer: Optional[ThreadPoolExecutor] = None
+    _progress_written = float('-inf')
+
+    @contextmanager
+    def reporting_progress(self) -> Iterator[None]:
+        """
+        Write the progress of this job from one extra thread while the block runs.
+
+        Jobs do most of their work inside a transaction, so the progress is written with the
+        separate database connection of that thread, to be visible to polling clients right away.
+        """
+        self._progress_writer = ThreadPoolExecutor(max_workers=1)
+        try:
+            yield
+        finally:
+            writer, self._progress_writer = self._progress_writer, None
+            # the connection must be looked up in the thread which opened it
+            writer.submit(lambda: connection.close()).result()
+            writer.shutdown()
+
+    def report_progress(self, processed: int, total: Optional[int] = None) -> None:
+        """Record the progress of this job, at most every `progress_interval` seconds."""
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        finished = self.total is not None and self.processed >= self.total
+        if not finished and now - self._progress_written < self.progress_interval:
+            return
+        self._progress_written = now
+
+        update = ImportExportJob.objects.filter(id=self.id).update
+        fields = {'processed': self.processed, 'total': self.total}
+        if self._progress_writer is None:
+            update(**fields)
+        else:
+            self._progress_writer.submit(update, **fields).result()
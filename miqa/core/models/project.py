@@ -8,8 +8,8 @@ from django.dispatch import receiver
 from django_extensions.db.models import TimeStampedModel
 from guardian.shortcuts import assign_perm, get_perms, get_users_with_perms, remove_perm
 
-from miqa.core.models.scan import SCAN_TYPES, Scan
-from miqa.core.models.scan_decision import ScanDecision
+from miqa.core.models.review_progress import ReviewProgress
+from miqa.core.models.scan import SCAN_TYPES
 
 
 def default_evaluation_model_mapping():
@@ -94,26 +94,19 @@ class Project(TimeStampedModel, models.Model):
         )[-1]
 
     def get_status(self):
-        tier_2_reviewers = [
-            user.id for user in get_users_with_perms(self, only_with_perms_in=['tier_2_reviewer'])
-        ]
-        scans_in_project = Scan.objects.filter(experiment__project=self)
-        completed_scans_in_project = scans_in_project.alias(
-            latest_decider_id=models.Subquery(
-                ScanDecision.objects.filter(scan__id=models.OuterRef('id'))
-                .order_by('-created')
-                .values('creator_id')[:1]
-            ),
-            latest_decision=models.Subquery(
-                ScanDecision.objects.filter(scan__id=models.OuterRef('id'))
-                .order_by('-created')
-                .values('decision')[:1]
-            ),
-        ).filter(models.Q(latest_decider_id__in=tier_2_reviewers) | models.Q(latest_decision='U'))
-
+        if hasattr(self, 'project_review_progress'):
+            # prefetched along with many projects, see ProjectViewSet
+            progress = next(iter(self.project_review_progress), None)
+        else:
+            progress = self.review_progress.filter(experiment=None).first()
+        if progress is None:
+            # nothing has been counted in a new project yet
+            progress = ReviewProgress()
         return {
-            'total_scans': scans_in_project.count(),
-            'total_complete': completed_scans_in_project.count(),
+            'total_scans': progress.total_scans,
+            'total_complete': progress.complete,
+            'needs_tier_2_review': progress.needs_tier_2_review,
+            'unreviewed': progress.unreviewed,
         }
 
     def update_group(self, group_name, user_list):
@@ -137,6 +130,10 @@ class Project(TimeStampedModel, models.Model):
             if new_permitted_user not in old_list:
                 assign_perm(group_name, new_permitted_user, self)
 
+        if group_name == 'tier_2_reviewer':
+            # decisions count as complete depending on whether their creator is a tier 2 reviewer
+            ReviewProgress.update(self)
+
     class Meta:
         permissions = (
             ('collaborator', 'Collaborator'),
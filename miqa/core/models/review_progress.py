@@ -0,0 +1,119 @@
+from typing import Iterable, Optional, Union
+from uuid import UUID
+
+from django.db import models, transaction
+from django.dispatch import receiver
+from guardian.shortcuts import get_users_with_perms
+
+from miqa.core.models.experiment import Experiment
+from miqa.core.models.scan import Scan
+
+PROGRESS_FIELDS = ['total_scans', 'complete', 'needs_tier_2_review', 'unreviewed']
+
+
+class ReviewProgress(models.Model):
+    """
+    Denormalized review progress of a project, or of one of its experiments.
+
+    A scan is complete once its latest decision is usable or was made by a tier 2 reviewer. The
+    counts are recomputed whenever a decision is made, an import finishes or the tier 2 reviewers
+    of a project change, so reading them is a single row lookup. The row for the project as a
+    whole has no experiment.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project'],
+                condition=models.Q(experiment=None),
+                name='review_progress_project_unique',
+            ),
+        ]
+        verbose_name_plural = 'review progress'
+
+    project = models.ForeignKey('Project', related_name='review_progress', on_delete=models.CASCADE)
+    experiment = models.OneToOneField(
+        'Experiment',
+        null=True,
+        blank=True,
+        related_name='review_progress',
+        on_delete=models.CASCADE,
+    )
+    total_scans = models.PositiveIntegerField(default=0)
+    complete = models.PositiveIntegerField(default=0)
+    needs_tier_2_review = models.PositiveIntegerField(default=0)
+    unreviewed = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.experiment or self.project}: {self.complete}/{self.total_scans} complete'
+
+    @classmethod
+    @transaction.atomic
+    def update(
+        cls, project, experiment_ids: Optional[Iterable[Union[str, UUID]]] = None
+    ) -> 'ReviewProgress':
+        """
+        Recompute the progress of some experiments of a project (all by default) and its totals.
+
+        Updates of the same project are serialized by locking its row, so each one counts every
+        decision committed before it.
+        """
+        project_progress, _ = cls.objects.get_or_create(project=project, experiment=None)
+        project_progress = cls.objects.select_for_update().get(id=project_progress.id)
+
+        experiments = Experiment.objects.filter(project=project)
+        if experiment_ids is not None:
+            experiments = experiments.filter(id__in=experiment_ids)
+        tier_2_reviewers = get_users_with_perms(project, only_with_perms_in=['tier_2_reviewer'])
+        counts = {
+            row['experiment_id']: row
+            for row in Scan.objects.filter(experiment__in=experiments)
+            .order_by()
+            .values('experiment_id')
+            .annotate(
+                total_scans=models.Count('id'),
+                complete=models.Count(
+                    'id',
+                    filter=models.Q(latest_decision_code='U')
+                    | models.Q(latest_decision_creator__in=tier_2_reviewers.values('id')),
+                ),
+                unreviewed=models.Count('id', filter=models.Q(latest_decision=None)),
+            )
+        }
+
+        existing = {
+            progress.experiment_id: progress
+            for progress in cls.objects.filter(experiment__in=experiments)
+        }
+        created, updated = [], []
+        for experiment_id in experiments.values_list('id', flat=True):
+            progress = existing.get(experiment_id)
+            if progress is None:
+                progress = cls(project=project, experiment_id=experiment_id)
+                created.append(progress)
+            else:
+                updated.append(progress)
+            row = counts.get(experiment_id, {})
+            progress.total_scans = row.get('total_scans', 0)
+            progress.complete = row.get('complete', 0)
+            progress.unreviewed = row.get('unreviewed', 0)
+            progress.needs_tier_2_review = (
+                progress.total_scans - progress.complete - progress.unreviewed
+            )
+        cls.objects.bulk_create(created)
+        cls.objects.bulk_update(updated, PROGRESS_FIELDS)
+
+        totals = cls.objects.filter(project=project, experiment__isnull=False).aggregate(
+            **{field: models.Sum(field) for field in PROGRESS_FIELDS}
+        )
+        for field in PROGRESS_FIELDS:
+            setattr(project_progress, field, totals[field] or 0)
+        project_progress.save(update_fields=PROGRESS_FIELDS)
+        return project_progress
+
+
+# imports create objects in bulk, without this signal, and update the progress when done
+@receiver(models.signals.post_save, sender=Scan)
+def update_review_progress(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields and 'latest_decision' in update_fields):
+        ReviewProgress.update(instance.experiment.project, [instance.experiment_id])
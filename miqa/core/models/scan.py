@@ -2,9 +2,14 @@ from __future__ import annotations
 
 from uuid import uuid4
 
+from django.contrib.auth.models import User
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.dispatch import receiver
 from django_extensions.db.models import TimeStampedModel
 
+from miqa.core.models.scan_decision import DECISION_CHOICES, ScanDecision
+
 SCAN_TYPES = [
     ('T1', 'T1'),
     ('T2', 'T2'),
@@ -29,6 +34,9 @@ SCAN_TYPES = [
 class Scan(TimeStampedModel, models.Model):
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['experiment', 'latest_decision_code']),
+        ]
 
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     name = models.CharField(max_length=127, blank=False)
@@ -37,3 +45,52 @@ class Scan(TimeStampedModel, models.Model):
     subject_id = models.TextField(max_length=255, null=True)
     session_id = models.TextField(max_length=255, null=True)
     scan_link = models.TextField(max_length=1000, null=True)
+    # denormalized from the decisions of the scan, so filtering by the current decision is a join
+    latest_decision = models.ForeignKey(
+        'ScanDecision', null=True, blank=True, related_name='+', on_delete=models.SET_NULL
+    )
+    latest_decision_code = models.CharField(max_length=2, choices=DECISION_CHOICES, blank=True)
+    latest_decision_creator = models.ForeignKey(
+        User, null=True, blank=True, related_name='+', on_delete=models.SET_NULL
+    )
+
+    def set_latest_decision(self, decision: ScanDecision) -> None:
+        self.latest_decision = decision
+        self.latest_decision_code = decision.decision
+        self.latest_decision_creator = decision.creator
+        self.save(
+            update_fields=['latest_decision', 'latest_decision_code', 'latest_decision_creator']
+        )
+
+    @classmethod
+    def update_latest_decisions(cls, scans: models.QuerySet[Scan]) -> int:
+        """
+        Point scans at their latest decision again, with a single UPDATE.
+
+        This is for decisions created in bulk or edited and deleted outside of the API, which
+        bypass the signal keeping the latest decision of a scan up to date.
+        """
+        latest_decisions = ScanDecision.objects.filter(scan=models.OuterRef('id')).order_by(
+            models.F('created').desc(nulls_last=True)
+        )
+        return scans.update(
+            latest_decision=models.Subquery(latest_decisions.values('id')[:1]),
+            latest_decision_code=Coalesce(
+                models.Subquery(latest_decisions.values('decision')[:1]), models.Value('')
+            ),
+            latest_decision_creator=models.Subquery(latest_decisions.values('creator')[:1]),
+        )
+
+
+# imports create decisions in bulk, without this signal, and call update_latest_decisions instead
+@receiver(models.signals.post_save, sender=ScanDecision)
+def set_latest_decision(sender, instance, created, **kwargs):
+    if not created:
+        return
+    scan = instance.scan
+    current = scan.latest_decision
+    if current is None or (
+        instance.created is not None
+        and (current.created is None or instance.created >= current.created)
+    ):
+        scan.set_latest_decision(instance)
@@ -14,9 +14,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from miqa.core.models import Experiment, Project, ScanDecision
+from miqa.core.models import Experiment, Project, ReviewProgress, ScanDecision
 from miqa.core.rest.permissions import project_permission_required
-from miqa.core.rest.scan import ScanSerializer
+from miqa.core.rest.scan import ScanSerializer, scan_prefetches
 
 from .permissions import ArchivedProject, LockContention, UserHoldsExperimentLock
 
@@ -49,6 +49,31 @@ class ExperimentSerializer(serializers.ModelSerializer):
     )
 
 
+class ExperimentSummarySerializer(serializers.ModelSerializer):
+    """An experiment with the review progress of its scans, rather than the scans themselves."""
+
+    class Meta:
+        model = Experiment
+        fields = ['id', 'name', 'lock_owner', 'project', 'note', 'status']
+        ref_name = 'project_experiment_summary'
+
+    lock_owner = LockOwnerSerializer()
+    project = serializers.PrimaryKeyRelatedField(  # type: ignore
+        read_only=True, pk_field=UUIDField()
+    )
+    status = serializers.SerializerMethodField('get_status')
+
+    def get_status(self, obj):
+        # experiments without scans may not have any progress yet
+        progress = getattr(obj, 'review_progress', None) or ReviewProgress()
+        return {
+            'total_scans': progress.total_scans,
+            'total_complete': progress.complete,
+            'needs_tier_2_review': progress.needs_tier_2_review,
+            'unreviewed': progress.unreviewed,
+        }
+
+
 class ExperimentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Experiment
@@ -81,7 +106,16 @@ class ExperimentViewSet(ReadOnlyModelViewSet, mixins.CreateModelMixin, mixins.De
             [f'core.{perm}' for perm in Project().get_read_permission_groups()],
             any_perm=True,
         )
-        return Experiment.objects.filter(project__in=projects)
+        experiments = Experiment.objects.filter(project__in=projects).select_related('lock_owner')
+        if self.action in ['list', 'retrieve', 'note']:
+            experiments = experiments.prefetch_related(*scan_prefetches('scans'))
+        return experiments
+
+    def perform_destroy(self, instance):
+        project = instance.project
+        super().perform_destroy(instance)
+        # drop the scans of the experiment from the totals of its project
+        ReviewProgress.update(project, experiment_ids=[])
 
     @swagger_auto_schema(
         request_body=ExperimentCreateSerializer(),
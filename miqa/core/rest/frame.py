@@ -27,6 +27,15 @@ class EvaluationSerializer(serializers.ModelSerializer):
         fields = ['results', 'evaluation_model']
 
 
+def frame_download_url(frame: Frame) -> Optional[str]:
+    """The URL to download a frame from storage, or None if it must be downloaded from MIQA."""
+    if frame.storage_mode == StorageMode.CONTENT_STORAGE:
+        return frame.content.url
+    if frame.storage_mode == StorageMode.S3_PATH:
+        return frame.s3_download_url
+    return None
+
+
 class FrameSerializer(serializers.ModelSerializer):
     class Meta:
         model = Frame
@@ -51,11 +60,19 @@ class FrameSerializer(serializers.ModelSerializer):
         return ''.join(Path(filename).suffixes)
 
     def get_download_url(self, obj: Frame) -> Optional[str]:
-        if obj.storage_mode == StorageMode.CONTENT_STORAGE:
-            return obj.content.url
-        if obj.storage_mode == StorageMode.S3_PATH:
-            return obj.s3_download_url
-        return None
+        return frame_download_url(obj)
+
+
+class FrameDownloadUrlSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Frame
+        fields = ['id', 'download_url']
+        ref_name = 'frame_download_url'
+
+    download_url = serializers.SerializerMethodField('get_download_url')
+
+    def get_download_url(self, obj: Frame) -> Optional[str]:
+        return frame_download_url(obj)
 
 
 def is_valid_experiment(experiment_id):
@@ -105,7 +122,9 @@ class FrameViewSet(
             [f'core.{perm}' for perm in Project().get_read_permission_groups()],
             any_perm=True,
         )
-        return Frame.objects.filter(scan__experiment__project__in=projects)
+        return Frame.objects.filter(scan__experiment__project__in=projects).select_related(
+            'frame_evaluation'
+        )
 
     @swagger_auto_schema(
         request_body=FrameCreateSerializer(),
@@ -145,6 +164,19 @@ class FrameViewSet(
             status=status.HTTP_201_CREATED,
         )
 
+    @swagger_auto_schema(responses={200: FrameDownloadUrlSerializer()})
+    @project_permission_required(experiments__scans__frames__pk='pk')
+    @action(detail=True)
+    def download_url(self, request, pk=None, **kwargs):
+        """
+        Get the URL to download a frame from storage.
+
+        Clients which only need a few frames can request their URLs here, rather than loading
+        whole scans. The URL is null for frames stored locally, which are served by download.
+        """
+        frame: Frame = self.get_object()
+        return Response(FrameDownloadUrlSerializer(frame).data)
+
     @action(detail=True)
     @project_permission_required(experiments__scans__frames__pk='pk')
     def download(self, request, pk=None, **kwargs):
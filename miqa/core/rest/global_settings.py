@@ -5,8 +5,9 @@ from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from miqa.core.models import GlobalSettings
-from miqa.core.tasks import export_data, import_data
+from miqa.core.models import GlobalSettings, ImportExportJob
+from miqa.core.rest.import_export_job import ImportExportJobSerializer
+from miqa.core.tasks import run_export_job, run_import_job
 
 
 class IsSuperUser(BasePermission):
@@ -53,31 +54,26 @@ class GlobalSettingsViewSet(ViewSet):
             global_settings.save()
         return Response(GlobalSettingsSerializer(global_settings).data)
 
-    @swagger_auto_schema(responses={204: 'Import succeeded.'})
+    @swagger_auto_schema(responses={202: ImportExportJobSerializer()})
     @action(
         detail=False,
         url_path='import',
         methods=['POST'],
     )
     def import_(self, request, **kwargs):
-        error_list = import_data(None)
-        if len(error_list) > 0:
-            return Response(
-                {
-                    'detail': 'The following errors occurred during import. \
-                        Objects were still created for missing files, \
-                        but these objects will be non-functional until the file is present.',
-                    'errors': error_list,
-                }
-            )
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        job = ImportExportJob.objects.create(kind=ImportExportJob.Kind.IMPORT, creator=request.user)
+        run_import_job.delay(str(job.id))
+        job.refresh_from_db()
+        return Response(ImportExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-    @swagger_auto_schema(responses={204: 'Export succeeded.'})
+    @swagger_auto_schema(responses={202: ImportExportJobSerializer()})
     @action(
         detail=False,
         url_path='export',
         methods=['POST'],
     )
     def export_(self, request, **kwargs):
-        export_data(None)
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        job = ImportExportJob.objects.create(kind=ImportExportJob.Kind.EXPORT, creator=request.user)
+        run_export_job.delay(str(job.id))
+        job.refresh_from_db()
+        return Response(ImportExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
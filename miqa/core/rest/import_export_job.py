@@ -0,0 +1,45 @@
+from django.db.models import Q
+from guardian.shortcuts import get_objects_for_user
+from rest_framework import mixins, serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import GenericViewSet
+
+from miqa.core.models import ImportExportJob, Project
+
+
+class ImportExportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportExportJob
+        fields = [
+            'id',
+            'kind',
+            'project',
+            'state',
+            'finished',
+            'processed',
+            'total',
+            'errors',
+            'warnings',
+            'result',
+            'created',
+            'modified',
+        ]
+        ref_name = 'import_export_job'
+
+
+class ImportExportJobViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+    """Poll the progress of imports and exports, which run in the background."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ImportExportJobSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_superuser:
+            return ImportExportJob.objects.all()
+        projects = get_objects_for_user(
+            user,
+            [f'core.{perm}' for perm in Project().get_read_permission_groups()],
+            any_perm=True,
+        )
+        return ImportExportJob.objects.filter(Q(creator=user) | Q(project__in=projects))
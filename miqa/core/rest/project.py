@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import no_body, swagger_auto_schema
 from guardian.shortcuts import get_objects_for_user, get_users_with_perms
 from rest_framework import mixins, serializers, status
@@ -7,11 +9,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from miqa.core.models import Project
-from miqa.core.rest.experiment import ExperimentSerializer
+from miqa.core.models import Experiment, ImportExportJob, Project, ReviewProgress, Scan
+from miqa.core.rest.experiment import ExperimentSerializer, ExperimentSummarySerializer
+from miqa.core.rest.import_export_job import ImportExportJobSerializer
 from miqa.core.rest.permissions import project_permission_required
+from miqa.core.rest.scan import scan_prefetches
 from miqa.core.rest.user import UserSerializer
-from miqa.core.tasks import export_data, import_data
+from miqa.core.tasks import iter_export_csv, iter_export_json, run_export_job, run_import_job
 
 
 class ProjectSettingsSerializer(serializers.ModelSerializer):
@@ -74,32 +78,60 @@ class ProjectTaskOverviewSerializer(serializers.ModelSerializer):
         return obj.experiments.count()
 
     def get_total_scans(self, obj):
-        return sum([exp.scans.count() for exp in obj.experiments.all()])
+        return Scan.objects.filter(experiment__project=obj).count()
 
     def get_my_project_role(self, obj):
         return obj.get_user_role(self.context['user'])
 
     def get_scan_states(self, obj):
-        def convert_state_string(last_decision):
-            if last_decision.decision == 'U':
+        tier_2_reviewers = set(
+            get_users_with_perms(
+                obj, only_with_perms_in=['tier_2_reviewer'], with_superusers=True
+            ).values_list('id', flat=True)
+        )
+
+        def convert_state_string(scan):
+            if not scan['latest_decision']:
+                return 'unreviewed'
+            # scan is complete if it is marked usable by anyone
+            # or if marked at all by a tier 2 reviewer
+            if (
+                scan['latest_decision_code'] == 'U'
+                or scan['latest_decision_creator'] in tier_2_reviewers
+            ):
                 return 'complete'
-            if last_decision.creator:
-                last_reviewer_role = obj.get_user_role(last_decision.creator)
-                if last_reviewer_role == 'tier_2_reviewer':
-                    # scan is complete if it is marked usable by anyone
-                    # or if marked at all by a tier 2 reviewer
-                    return 'complete'
             return 'needs tier 2 review'
 
         return {
-            str(scan.id): convert_state_string(scan.decisions.latest('created'))
-            if scan.decisions.count() > 0
-            else 'unreviewed'
-            for exp in obj.experiments.all()
-            for scan in exp.scans.all()
+            str(scan['id']): convert_state_string(scan)
+            for scan in Scan.objects.filter(experiment__project=obj).values(
+                'id', 'latest_decision', 'latest_decision_code', 'latest_decision_creator'
+            )
         }
 
 
+class ProjectImportSerializer(serializers.Serializer):
+    incremental = serializers.BooleanField(
+        default=False,
+        help_text='Only create, update and delete the objects which changed since the last import.',
+    )
+    dry_run = serializers.BooleanField(
+        default=False,
+        help_text='Report the changes an incremental import would make, without making them.',
+    )
+
+
+class ProjectRetrieveSerializer(serializers.Serializer):
+    summary = serializers.BooleanField(
+        default=False,
+        help_text='List the experiments with their review progress, instead of all their scans.',
+    )
+
+
+class ProjectDownloadSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=['csv', 'json'], default='csv')
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
@@ -121,6 +153,18 @@ class ProjectSerializer(serializers.ModelSerializer):
         return obj.creator.username
 
 
+class ProjectSummarySerializer(ProjectSerializer):
+    class Meta(ProjectSerializer.Meta):
+        ref_name = 'project_summary'
+
+    experiments = serializers.SerializerMethodField('get_experiments')
+
+    def get_experiments(self, obj):
+        # fetched after the status, which creates any missing review progress
+        experiments = obj.experiments.select_related('lock_owner', 'review_progress')
+        return ExperimentSummarySerializer(experiments, many=True).data
+
+
 class ProjectViewSet(
     ReadOnlyModelViewSet,
     mixins.CreateModelMixin,
@@ -128,6 +172,7 @@ class ProjectViewSet(
 ):
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectSerializer
+    summary = False
 
     def get_queryset(self):
         projects = get_objects_for_user(
@@ -135,12 +180,34 @@ class ProjectViewSet(
             [f'core.{perm}' for perm in Project().get_read_permission_groups()],
             any_perm=True,
         )
-        if self.action == 'retrieve':
-            return projects.prefetch_related(
-                'experiments__scans__frames', 'experiments__scans__decisions'
+        projects = projects.select_related('creator').order_by('name')
+        if self.action in ['list', 'retrieve']:
+            projects = projects.prefetch_related(
+                Prefetch(
+                    'review_progress',
+                    queryset=ReviewProgress.objects.filter(experiment=None),
+                    to_attr='project_review_progress',
+                )
             )
-        else:
-            return projects.all().order_by('name')
+        if self.action == 'list' or (self.action == 'retrieve' and not self.summary):
+            projects = projects.prefetch_related(
+                Prefetch('experiments', queryset=Experiment.objects.select_related('lock_owner')),
+                *scan_prefetches('experiments__scans'),
+            )
+        return projects
+
+    @swagger_auto_schema(
+        query_serializer=ProjectRetrieveSerializer,
+        responses={200: ProjectSerializer()},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        serializer = ProjectRetrieveSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        self.summary = serializer.validated_data['summary']
+        if not self.summary:
+            return super().retrieve(request, *args, **kwargs)
+        # scans are loaded page by page, per experiment, from the scans endpoint
+        return Response(ProjectSummarySerializer(self.get_object()).data)
 
     def create(self, request, *args, **kwargs):
         if not settings.NORMAL_USERS_CAN_CREATE_PROJECTS and not request.user.is_superuser:
@@ -200,46 +267,62 @@ class ProjectViewSet(
 
     @swagger_auto_schema(
         request_body=no_body,
-        responses={204: 'Import succeeded.'},
+        query_serializer=ProjectImportSerializer,
+        responses={202: ImportExportJobSerializer()},
     )
     @project_permission_required()
     @action(detail=True, url_path='import', url_name='import', methods=['POST'])
     def import_(self, request, **kwargs):
         project: Project = self.get_object()
+        serializer = ProjectImportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
 
+        job = ImportExportJob.objects.create(
+            kind=ImportExportJob.Kind.IMPORT, project=project, creator=request.user
+        )
         # tasks sent to celery must use serializable arguments
-        error_list = import_data(project.id)
-        if len(error_list) > 0:
-            return Response(
-                {
-                    'detail': 'The following errors occurred during import.',
-                    'errors': error_list,
-                }
-            )
-
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        run_import_job.delay(str(job.id), **serializer.validated_data)
+        job.refresh_from_db()
+        return Response(ImportExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
     @swagger_auto_schema(
         request_body=no_body,
-        responses={204: 'Export succeeded.'},
+        responses={202: ImportExportJobSerializer()},
     )
     @project_permission_required()
     @action(detail=True, methods=['POST'])
     def export(self, request, **kwargs):
         project: Project = self.get_object()
 
+        job = ImportExportJob.objects.create(
+            kind=ImportExportJob.Kind.EXPORT, project=project, creator=request.user
+        )
         # tasks sent to celery must use serializable arguments
-        warning_list = export_data(project.id)
-        if len(warning_list) > 0:
-            return Response(
-                {
-                    'detail': 'The following warnings were raised during import. \
-                        Exports of uploaded scans are not yet supported.',
-                    'warnings': warning_list,
-                }
-            )
+        run_export_job.delay(str(job.id))
+        job.refresh_from_db()
+        return Response(ImportExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    @swagger_auto_schema(
+        query_serializer=ProjectDownloadSerializer,
+        responses={200: 'The project in the format of an import file.'},
+    )
+    @project_permission_required()
+    @action(detail=True, methods=['GET'])
+    def download(self, request, **kwargs):
+        project: Project = self.get_object()
+        serializer = ProjectDownloadSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data['file_format']
+
+        # stream the export, rather than building all of it in memory
+        if file_format == 'csv':
+            response = StreamingHttpResponse(iter_export_csv([project]), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(
+                iter_export_json([project]), content_type='application/json'
+            )
+        response['Content-Disposition'] = f'attachment; filename="{project.name}.{file_format}"'
+        return response
 
     @swagger_auto_schema(
         request_body=no_body,
@@ -1,10 +1,14 @@
+from typing import Iterable, List, Optional
+
+from django.db.models import Prefetch
 from django_filters import rest_framework as filters
+from drf_yasg.utils import swagger_auto_schema
 from guardian.shortcuts import get_objects_for_user
 from rest_framework import mixins, serializers
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import GenericViewSet
 
-from miqa.core.models import Experiment, Project, Scan
+from miqa.core.models import Experiment, Frame, Project, Scan, ScanDecision
 from miqa.core.rest.frame import FrameSerializer
 from miqa.core.rest.permissions import UserHoldsExperimentLock
 from miqa.core.rest.scan_decision import ScanDecisionSerializer
@@ -30,6 +34,51 @@ class ScanSerializer(serializers.ModelSerializer):
     decisions = ScanDecisionSerializer(many=True, read_only=True)
     experiment = serializers.SlugRelatedField(queryset=Experiment.objects.all(), slug_field='id')
 
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ScanFieldsSerializer(serializers.Serializer):
+    fields = serializers.CharField(
+        required=False,
+        help_text=(
+            'Comma separated fields to include in each scan, e.g. "id,name". '
+            'Leaving out frames and decisions makes large experiments much cheaper to list.'
+        ),
+    )
+
+    def validate_fields(self, value: str) -> List[str]:
+        fields = [field for field in value.split(',') if field]
+        unknown = set(fields) - set(ScanSerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(f'Unknown fields: {", ".join(sorted(unknown))}.')
+        return fields
+
+
+def scan_prefetches(path: str = '', fields: Optional[Iterable[str]] = None) -> List[Prefetch]:
+    """
+    Prefetch the frames and decisions which ScanSerializer needs for the scans at `path`.
+
+    For example, `experiments__scans` prefetches them for all scans of some projects. The
+    evaluations of frames and creators of decisions are joined to them, so serializing any
+    number of scans takes the same number of queries.
+    """
+    prefix = f'{path}__' if path else ''
+    fields = ScanSerializer.Meta.fields if fields is None else fields
+    prefetches = []
+    if 'frames' in fields:
+        prefetches.append(
+            Prefetch(f'{prefix}frames', queryset=Frame.objects.select_related('frame_evaluation'))
+        )
+    if 'decisions' in fields:
+        prefetches.append(
+            Prefetch(f'{prefix}decisions', queryset=ScanDecision.objects.select_related('creator'))
+        )
+    return prefetches
+
 
 class ScanViewSet(
     mixins.ListModelMixin,
@@ -38,13 +87,41 @@ class ScanViewSet(
     GenericViewSet,
 ):
     filter_backends = [filters.DjangoFilterBackend]
+    filterset_fields = ['experiment']
     permission_classes = [IsAuthenticated, UserHoldsExperimentLock]
     serializer_class = ScanSerializer
 
+    def get_fields(self) -> Optional[List[str]]:
+        """The scan fields requested with `?fields=`, or None for all of them."""
+        serializer = ScanFieldsSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data.get('fields')
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('fields', self.get_fields())
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         projects = get_objects_for_user(
             self.request.user,
             [f'core.{perm}' for perm in Project().get_read_permission_groups()],
             any_perm=True,
         )
-        return Scan.objects.filter(experiment__project__in=projects)
+        scans = Scan.objects.filter(experiment__project__in=projects)
+        if self.request.method != 'GET':
+            return scans
+
+        # only fetch the related objects of the fields which are serialized
+        fields = self.get_fields()
+        if fields is None or 'experiment' in fields:
+            scans = scans.select_related('experiment')
+        return scans.prefetch_related(*scan_prefetches(fields=fields))
+
+    @swagger_auto_schema(query_serializer=ScanFieldsSerializer)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(query_serializer=ScanFieldsSerializer)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django_filters import rest_framework as filters
 from guardian.shortcuts import get_objects_for_user, get_perms
 from rest_framework import mixins, serializers, status
@@ -47,7 +48,9 @@ class ScanDecisionViewSet(
             [f'core.{perm}' for perm in Project().get_read_permission_groups()],
             any_perm=True,
         )
-        return ScanDecision.objects.filter(scan__experiment__project__in=projects)
+        return ScanDecision.objects.filter(scan__experiment__project__in=projects).select_related(
+            'creator'
+        )
 
     # cannot use project_permission_required decorator because no pk is provided
     def create(self, request, **kwargs):
@@ -78,5 +81,7 @@ class ScanDecisionViewSet(
 
         ensure_experiment_lock(request_data['scan'], request_data['creator'])
         new_obj = ScanDecision(**request_data)
-        new_obj.save()
+        # saving the decision also makes it the latest decision of its scan
+        with transaction.atomic():
+            new_obj.save()
         return Response(ScanDecisionSerializer(new_obj).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+import io
+import threading
+import time
+from typing import Iterator, Tuple
+
+import boto3
+from botocore import UNSIGNED
+from botocore.client import Config
+from django.conf import settings
+
+# parts of a multipart upload must be at least 5 MiB, except for the last one
+S3_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+# cached presigned URLs are replaced this many seconds before they expire, so clients which
+# receive one still have time to use it
+PRESIGNED_URL_EXPIRY_MARGIN = 5 * 60
+PRESIGNED_URL_CACHE_SIZE = 100_000
+
+
+@lru_cache(maxsize=None)
+def get_s3_client(public: bool):
+    # boto3 clients are thread safe and expensive to create, so one is shared per mode
+    if public:
+        return boto3.client('s3', config=Config(signature_version=UNSIGNED))
+    else:
+        return boto3.client('s3')
+
+
+def split_s3_path(path: str) -> Tuple[str, str]:
+    """Split an `s3://bucket/key` path into its bucket and key."""
+    bucket, key = path.strip()[5:].split('/', maxsplit=1)
+    return bucket, key
+
+
+class PresignedUrlCache:
+    """
+    Presigned S3 download URLs, by bucket and key.
+
+    Presigning is local but not free, and serializing a project presigns a URL for each of its
+    frames, so URLs are reused until `PRESIGNED_URL_EXPIRY_MARGIN` seconds before they expire.
+    The least recently used URLs are dropped once there are more than `max_size`.
+    """
+
+    def __init__(self, expiration: int, max_size: int = PRESIGNED_URL_CACHE_SIZE):
+        self.expiration = expiration
+        self.max_size = max_size
+        self._urls: OrderedDict[Tuple[str, str], Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket: str, key: str) -> str:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._urls.get((bucket, key))
+            if cached is not None and cached[1] > now:
+                self._urls.move_to_end((bucket, key))
+                return cached[0]
+
+        url = get_s3_client(False).generate_presigned_url(
+            'get_object', Params={'Bucket': bucket, 'Key': key}, ExpiresIn=self.expiration
+        )
+        with self._lock:
+            self._urls[(bucket, key)] = (url, now + self.expiration - PRESIGNED_URL_EXPIRY_MARGIN)
+            self._urls.move_to_end((bucket, key))
+            while len(self._urls) > self.max_size:
+                self._urls.popitem(last=False)
+        return url
+
+
+@lru_cache(maxsize=None)
+def _presigned_url_cache() -> PresignedUrlCache:
+    return PresignedUrlCache(settings.S3_PRESIGNED_URL_EXPIRATION)
+
+
+def presigned_download_url(path: str) -> str:
+    """Return a presigned URL to download an `s3://bucket/key` path, cached until near expiry."""
+    bucket, key = split_s3_path(path)
+    return _presigned_url_cache().get(bucket, key)
+
+
+class S3Upload(io.RawIOBase):
+    """
+    Writable file which uploads its content to S3 in parts while it is written.
+
+    At most one part is held in memory. Nothing is visible in the bucket until `complete` is
+    called, and `abort` discards the parts uploaded so far. Files smaller than one part are
+    uploaded with a single request instead.
+    """
+
+    def __init__(self, client, bucket: str, key: str, part_size: int = S3_UPLOAD_PART_SIZE):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)[
+                'UploadId'
+            ]
+        part_number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def complete(self) -> None:
+        if self._upload_id is None:
+            self.client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts},
+            )
+        self._buffer.clear()
+
+    def abort(self) -> None:
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+        self._buffer.clear()
+
+
+@contextmanager
+def upload_s3_file(path: str) -> Iterator[S3Upload]:
+    """Upload what is written to the yielded file to an `s3://bucket/key` path."""
+    bucket, key = split_s3_path(path)
+    upload = S3Upload(get_s3_client(False), bucket, key)
+    try:
+        yield upload
+    except BaseException:
+        upload.abort()
+        raise
+    upload.complete()
@@ -1,53 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
-from io import BytesIO, StringIO
+from functools import lru_cache
+from hashlib import sha256
+from itertools import islice
 import json
+import logging
 from pathlib import Path
-import tempfile
-from typing import Dict, List, Optional
+import shutil
+from typing import (
+    BinaryIO,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+from uuid import UUID
 
 import boto3
-from botocore import UNSIGNED
-from botocore.client import Config
-from celery import shared_task
+from botocore.exceptions import ClientError
+from celery import group, shared_task
 import dateparser
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
 from guardian.shortcuts import assign_perm
 import pandas
 from rest_framework.exceptions import APIException
 
+from miqa.core.compression import decompression_errors, open_text, split_compression
 from miqa.core.conversion.import_export_csvs import (
+    IMPORT_CSV_COLUMNS,
     import_dataframe_to_dict,
     import_dict_to_dataframe,
     validate_import_dict,
 )
 from miqa.core.conversion.nifti_to_zarr_ngff import nifti_to_zarr_ngff
+from miqa.core.file_cache import FileCache
 from miqa.core.models import (
     Evaluation,
+    EvaluationRun,
     Experiment,
     Frame,
     GlobalSettings,
+    ImportExportJob,
     Project,
+    ReviewProgress,
     Scan,
     ScanDecision,
 )
 from miqa.core.models.frame import StorageMode
 from miqa.core.models.scan_decision import DECISION_CHOICES, default_identified_artifacts
+from miqa.core.s3 import get_s3_client, split_s3_path, upload_s3_file
 
+logger = logging.getLogger(__name__)
+
+# upper bound on the number of ids in a single `id__in` lookup
+FRAME_QUERY_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def _get_file_cache() -> FileCache:
+    return FileCache(Path(settings.FRAME_CACHE_DIR), settings.FRAME_CACHE_MAX_SIZE)
+
+
+def _local_s3_file(path: str, public: bool, etag: Optional[str] = None) -> Path:
+    """
+    Return a local copy of an S3 object, downloading it only if it changed since last time.
+
+    The current `etag` of the object is looked up, unless the caller already knows it.
+    """
+    bucket, key = split_s3_path(path)
+    client = get_s3_client(public)
+    if etag is None:
+        etag = client.head_object(Bucket=bucket, Key=key)['ETag']
+    return _get_file_cache().get(
+        f's3://{bucket}/{key}@{etag}',
+        # streams the object to disk in parts, rather than holding it in memory
+        lambda dest: client.download_file(bucket, key, str(dest)),
+        suffix=''.join(Path(key).suffixes),
+    )
 
-def _get_s3_client(public: bool):
-    if public:
-        return boto3.client('s3', config=Config(signature_version=UNSIGNED))
-    else:
-        return boto3.client('s3')
 
+def _local_frame_path(frame: Frame, version: Optional[str]) -> Path:
+    """Return a local copy of the file of a frame, given its `_frame_version`."""
+    if frame.storage_mode == StorageMode.S3_PATH:
+        if version is None:
+            # looking the object up again would only fail the same way
+            raise FileNotFoundError(f'Could not locate frame file at {frame.raw_path}.')
+        return _local_s3_file(frame.raw_path, frame.scan.experiment.project.s3_public, version)
+    if frame.storage_mode == StorageMode.CONTENT_STORAGE:
 
-def _download_from_s3(path: str, public: bool) -> bytes:
-    bucket, key = path.strip()[5:].split('/', maxsplit=1)
-    client = _get_s3_client(public)
-    buf = BytesIO()
-    client.download_fileobj(bucket, key, buf)
-    return buf.getvalue()
+        def fetch(dest: Path):
+            with open(dest, 'wb') as fd, frame.content.open() as content:
+                shutil.copyfileobj(content, fd)
+
+        # uploaded content is stored under a unique name and never modified
+        return _get_file_cache().get(
+            f'content://{frame.content.name}',
+            fetch,
+            suffix=''.join(Path(frame.content.name).suffixes),
+        )
+    return Path(frame.raw_path)
+
+
+def _frame_version(frame: Frame) -> Optional[str]:
+    """Identify the file content of a frame, e.g. by its S3 ETag, if the file exists."""
+    if frame.storage_mode == StorageMode.S3_PATH:
+        bucket, key = split_s3_path(frame.raw_path)
+        client = get_s3_client(frame.scan.experiment.project.s3_public)
+        try:
+            return client.head_object(Bucket=bucket, Key=key)['ETag']
+        except ClientError:
+            return None
+    if frame.storage_mode == StorageMode.CONTENT_STORAGE:
+        # uploaded content is stored under a unique name and never modified
+        return frame.content.name
+    try:
+        stat = frame.path.stat()
+    except OSError:
+        return None
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _fingerprint(frame: Frame, model_name: str, version: Optional[str]) -> Optional[str]:
+    if version is None:
+        return None
+    return sha256(f'{frame.raw_path}\n{version}\n{model_name}'.encode()).hexdigest()
+
+
+def _frame_fingerprint(frame: Frame, model_name: str) -> Optional[str]:
+    """Identify the file content of a frame and the model evaluating it, if the file exists."""
+    return _fingerprint(frame, model_name, _frame_version(frame))
 
 
 @shared_task
@@ -74,72 +165,146 @@ def evaluate_frame_content(frame_id):
 
     frame = Frame.objects.get(id=frame_id)
     eval_model_name = frame.scan.experiment.project.evaluation_models[[frame.scan.scan_type][0]]
-    s3_public = frame.scan.experiment.project.s3_public
-    eval_model = available_evaluation_models[eval_model_name].load()
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        # need to send a local version to NN
-        if frame.storage_mode == StorageMode.LOCAL_PATH:
-            dest = Path(frame.raw_path)
-        else:
-            dest = Path(tmpdirname, frame.content.name.split('/')[-1])
-            with open(dest, 'wb') as fd:
-                if frame.storage_mode == StorageMode.S3_PATH:
-                    fd.write(_download_from_s3(frame.content.url, s3_public))
-                else:
-                    fd.write(frame.content.open().read())
-        result = evaluate1(eval_model, dest)
-
-        Evaluation.objects.create(
-            frame=frame,
-            evaluation_model=eval_model_name,
-            results=result,
-        )
+    eval_model = available_evaluation_models[eval_model_name].get()
+    # version the file before reading it, and reuse the S3 ETag for the download
+    version = _frame_version(frame)
+    # need to send a local version to NN
+    result = evaluate1(eval_model, _local_frame_path(frame, version))
 
+    Evaluation.objects.create(
+        frame=frame,
+        evaluation_model=eval_model_name,
+        results=result,
+        fingerprint=_fingerprint(frame, eval_model_name, version) or '',
+    )
 
-@shared_task
-def evaluate_data(frames_by_project):
+
+def _evaluate_frames(model_name: str, frames: List[Frame]):
     from miqa.learning.evaluation_models import available_evaluation_models
     from miqa.learning.nn_inference import evaluate_many
 
-    model_to_frames_map = {}
-    for project_id, frame_ids in frames_by_project.items():
-        project = Project.objects.get(id=project_id)
-        for frame_id in frame_ids:
-            frame = Frame.objects.get(id=frame_id)
-            file_path = frame.raw_path
-            if frame.storage_mode == StorageMode.S3_PATH or Path(file_path).exists():
+    current_model = available_evaluation_models[model_name].get()
+    # downloaded files are kept in the cache until the whole chunk is evaluated
+    with _get_file_cache().holding() as hold, ThreadPoolExecutor(
+        max_workers=settings.S3_DOWNLOAD_WORKERS
+    ) as executor:
+        # version files before reading them, so a file changing in between is not missed; the
+        # S3 ETags are reused by the downloads, rather than requested again
+        versions = dict(zip(frames, executor.map(_frame_version, frames)))
+        local_paths = {
+            frame: executor.submit(
+                lambda frame: hold(_local_frame_path(frame, versions[frame])), frame
+            )
+            for frame in frames
+        }
+        # the model starts on the first frames while the following ones keep downloading
+        path_results = evaluate_many(
+            current_model,
+            (local_path.result() for local_path in local_paths.values()),
+            batch_size=settings.EVALUATION_BATCH_SIZE,
+            num_workers=settings.EVALUATION_LOADER_WORKERS,
+        )
+
+    Evaluation.objects.bulk_create(
+        [
+            Evaluation(
+                frame=frame,
+                evaluation_model=model_name,
+                results=path_results[local_path.result()],
+                fingerprint=_fingerprint(frame, model_name, versions[frame]) or '',
+            )
+            for frame, local_path in local_paths.items()
+        ]
+    )
+
+
+@shared_task
+def evaluate_frame_chunk(run_id: str, model_name: str, frame_ids: List[str]):
+    evaluated_count = 0
+    try:
+        # frames which already have an evaluation were handled by an earlier, interrupted run
+        frames = list(
+            Frame.objects.filter(id__in=frame_ids, frame_evaluation__isnull=True).select_related(
+                'scan__experiment__project'
+            )
+        )
+        if frames:
+            _evaluate_frames(model_name, frames)
+        evaluated_count = len(frames)
+    finally:
+        # a failed chunk still counts towards completion, so the run is not left dangling
+        with transaction.atomic():
+            run = EvaluationRun.objects.select_for_update().get(id=run_id)
+            run.completed_chunks += 1
+            run.evaluated_frames += evaluated_count
+            run.save(update_fields=['completed_chunks', 'evaluated_frames', 'modified'])
+            is_last_chunk = run.completed_chunks == run.total_chunks
+        if is_last_chunk:
+            evaluation_complete.delay(run_id)
+
+
+@shared_task
+def evaluation_complete(run_id: str):
+    run = EvaluationRun.objects.get(id=run_id)
+    run.completed = timezone.now()
+    run.save(update_fields=['completed', 'modified'])
+    logger.info(f'Evaluated {run.evaluated_frames} of {run.total_frames} frames in run {run_id}.')
+
+
+def _frames_by_model(frames_by_project) -> Dict[str, List[str]]:
+    # must use str, not UUID, to get sent to celery task properly
+    model_to_frames_map: Dict[str, List[str]] = {}
+    frame_ids = [
+        frame_id
+        for project_frame_ids in frames_by_project.values()
+        for frame_id in project_frame_ids
+    ]
+    # resolve frames in bounded batches, fetching everything needed to pick a model up front
+    for batch_start in range(0, len(frame_ids), FRAME_QUERY_BATCH_SIZE):
+        frames = Frame.objects.filter(
+            id__in=frame_ids[batch_start : batch_start + FRAME_QUERY_BATCH_SIZE]
+        ).select_related('scan__experiment__project')
+        for frame in frames:
+            project = frame.scan.experiment.project
+            if frame.storage_mode == StorageMode.S3_PATH or Path(frame.raw_path).exists():
                 eval_model_name = project.evaluation_models[[frame.scan.scan_type][0]]
                 if eval_model_name not in model_to_frames_map:
                     model_to_frames_map[eval_model_name] = []
-                model_to_frames_map[eval_model_name].append(frame)
-
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        tmpdir = Path(tmpdirname)
-        for model_name, frame_set in model_to_frames_map.items():
-            current_model = available_evaluation_models[model_name].load()
-            file_paths = {frame: frame.raw_path for frame in frame_set}
-            for frame, file_path in file_paths.items():
-                if frame.storage_mode == StorageMode.S3_PATH:
-                    s3_public = frame.scan.experiment.project.s3_public
-                    dest = tmpdir / frame.path.name
-                    with open(dest, 'wb') as fd:
-                        fd.write(_download_from_s3(file_path, s3_public))
-                    file_paths[frame] = dest
-            results = evaluate_many(current_model, list(file_paths.values()))
-
-            Evaluation.objects.bulk_create(
-                [
-                    Evaluation(
-                        frame=frame,
-                        evaluation_model=model_name,
-                        results=results[file_paths[frame]],
-                    )
-                    for frame in frame_set
-                ]
-            )
+                model_to_frames_map[eval_model_name].append(str(frame.id))
+    return model_to_frames_map
+
 
+@shared_task
+def evaluate_data(frames_by_project, job_id: Optional[str] = None):
+    model_to_frames_map = _frames_by_model(frames_by_project)
 
-def import_data(project_id: Optional[str]):
+    # each chunk only needs one model, so chunks can be spread across all workers and
+    # each worker process only loads the models it is actually given
+    chunk_size = settings.EVALUATION_CHUNK_SIZE
+    chunks = [
+        (model_name, frame_ids[chunk_start : chunk_start + chunk_size])
+        for model_name, frame_ids in model_to_frames_map.items()
+        for chunk_start in range(0, len(frame_ids), chunk_size)
+    ]
+    if not chunks:
+        return
+
+    # MIQA runs celery without a result backend, so chords are not available; instead the
+    # last chunk to finish triggers evaluation_complete
+    run = EvaluationRun.objects.create(
+        project_id=next(iter(frames_by_project)) if len(frames_by_project) == 1 else None,
+        job_id=job_id,
+        total_chunks=len(chunks),
+        total_frames=sum(len(frame_ids) for frame_ids in model_to_frames_map.values()),
+    )
+    group(
+        evaluate_frame_chunk.s(str(run.id), model_name, frame_ids)
+        for model_name, frame_ids in chunks
+    ).apply_async()
+
+
+def _import_file(project_id: Optional[str]) -> Tuple[Optional[Project], str, Path]:
+    """Find the import file of a project, or the global import file, and a local path to it."""
     if project_id is None:
         project = None
         import_path = GlobalSettings.load().import_path
@@ -149,185 +314,859 @@ def import_data(project_id: Optional[str]):
         import_path = project.import_path
         s3_public = project.s3_public
 
+    if not split_compression(import_path)[0].endswith(('.csv', '.json')):
+        raise APIException(
+            f'Invalid import file {import_path}. Must be CSV or JSON, '
+            'optionally compressed with gzip (.gz) or zstd (.zst).'
+        )
+    if import_path.startswith('s3://'):
+        try:
+            return project, import_path, _local_s3_file(import_path, s3_public)
+        except boto3.exceptions.Boto3Error:
+            raise APIException(f'Could not locate import file at {import_path}.')
+    return project, import_path, Path(import_path)
+
+
+def _is_csv(path: str) -> bool:
+    return split_compression(path)[0].endswith('.csv')
+
+
+@contextmanager
+def _reading_import_file(import_path: str) -> Iterator[None]:
+    """Report errors while opening or reading an import file as problems with that file."""
     try:
-        if import_path.endswith('.csv'):
-            if import_path.startswith('s3://'):
-                buf = _download_from_s3(import_path, s3_public).decode('utf-8')
-            else:
-                with open(import_path) as fd:
-                    buf = fd.read()
-            import_dict = import_dataframe_to_dict(
-                pandas.read_csv(StringIO(buf), index_col=False, na_filter=False).astype(str),
-                project,
-            )
-        elif import_path.endswith('.json'):
-            if import_path.startswith('s3://'):
-                import_dict = json.loads(_download_from_s3(import_path, s3_public))
-            else:
-                with open(import_path) as fd:
-                    import_dict = json.load(fd)
-        else:
-            raise APIException(f'Invalid import file {import_path}. Must be CSV or JSON.')
-    except (FileNotFoundError, boto3.exceptions.Boto3Error):
+        yield
+    except FileNotFoundError:
         raise APIException(f'Could not locate import file at {import_path}.')
     except PermissionError:
         raise APIException(f'MIQA lacks permission to read {import_path}.')
+    except decompression_errors():
+        raise APIException(f'Could not decompress import file {import_path}.')
 
-    import_dict, not_found_errors = validate_import_dict(import_dict, project)
-    perform_import(import_dict)
+
+@contextmanager
+def _opening_import_file(import_path: str, path: Path) -> Iterator[Tuple[BinaryIO, TextIO]]:
+    """
+    Open the local copy of an import file as text, decompressing it if needed.
+
+    The raw file is yielded as well, since its position tells how much of the file was read.
+    Only opening the file reports errors as problems with the import file; reads must be wrapped
+    in `_reading_import_file`, so errors raised by the rest of the import are left alone.
+    """
+    with ExitStack() as stack:
+        with _reading_import_file(import_path):
+            raw = stack.enter_context(open(path, 'rb'))
+            fd = stack.enter_context(open_text(raw, import_path))
+        yield raw, fd
+
+
+def _read_import_csv(fd: TextIO, import_path: str) -> pandas.DataFrame:
+    with _reading_import_file(import_path):
+        # read every value as written, e.g. keep the leading zeros of subject ids
+        return pandas.read_csv(fd, index_col=False, na_filter=False, dtype=str)
+
+
+def _read_import_csv_chunks(
+    fd: TextIO, import_path: str, chunksize: int
+) -> Iterator[pandas.DataFrame]:
+    with _reading_import_file(import_path):
+        reader = pandas.read_csv(
+            fd, index_col=False, na_filter=False, dtype=str, chunksize=chunksize
+        )
+    while True:
+        # only reading the file is wrapped, not the work done on each chunk by the caller
+        with _reading_import_file(import_path):
+            df = next(reader, None)
+        if df is None:
+            return
+        yield df
+
+
+def _read_import_dict(
+    project: Optional[Project], import_path: str, path: Path
+) -> Tuple[dict, List[str]]:
+    """Read and validate the import file of a project, or the global import file."""
+    with _opening_import_file(import_path, path) as (_, fd):
+        if _is_csv(import_path):
+            import_dict = import_dataframe_to_dict(_read_import_csv(fd, import_path), project)
+        else:
+            with _reading_import_file(import_path):
+                import_dict = json.load(fd)
+
+    return validate_import_dict(import_dict, project)
+
+
+def _stream_csv_import(
+    import_path: str,
+    path: Path,
+    project: Optional[Project],
+    job: Optional[ImportExportJob] = None,
+) -> List[str]:
+    """
+    Import a CSV file in chunks of `IMPORT_CHUNK_SIZE` rows, all in one transaction.
+
+    Only one chunk of the file is held in memory at a time; objects created from earlier chunks
+    are looked up in the database when later rows add to them.
+    """
+    not_found_errors: List[str] = []
+    previous_evaluations: Dict[str, dict] = {}
+    cleared_projects: Dict[str, Project] = {}
+    frames_by_project: Dict[str, Set[str]] = {}
+    with _opening_import_file(import_path, path) as (raw, fd), transaction.atomic():
+        # progress is measured in bytes of the possibly compressed file, so it needs no extra pass
+        total = path.stat().st_size
+        for df in _read_import_csv_chunks(fd, import_path, settings.IMPORT_CHUNK_SIZE):
+            chunk_dict, chunk_errors = validate_import_dict(
+                import_dataframe_to_dict(df, project), project
+            )
+            not_found_errors += chunk_errors
+            for project_name in chunk_dict['projects'].keys() - cleared_projects.keys():
+                cleared_projects[project_name] = _get_import_project(project_name)
+                previous_evaluations.update(_clear_project(cleared_projects[project_name]))
+            for project_id, frame_ids in _create_import_objects(
+                chunk_dict, previous_evaluations, merge=True
+            ).items():
+                frames_by_project.setdefault(project_id, set()).update(frame_ids)
+            if job:
+                job.report_progress(raw.tell(), total)
+        for project_object in cleared_projects.values():
+            ReviewProgress.update(project_object)
+
+    evaluate_data.delay(
+        {project_id: list(frame_ids) for project_id, frame_ids in frames_by_project.items()},
+        job_id=str(job.id) if job else None,
+    )
+    if job:
+        job.report_progress(total, total)
     return not_found_errors
 
 
+def import_data(project_id: Optional[str], job: Optional[ImportExportJob] = None):
+    project, import_path, path = _import_file(project_id)
+    if _is_csv(import_path):
+        return _stream_csv_import(import_path, path, project, job)
+
+    import_dict, not_found_errors = _read_import_dict(project, import_path, path)
+    perform_import(import_dict, job_id=str(job.id) if job else None)
+    if job:
+        job.report_progress(len(import_dict['projects']), len(import_dict['projects']))
+    return not_found_errors
+
+
+def import_data_incremental(
+    project_id: Optional[str], dry_run: bool = False, job: Optional[ImportExportJob] = None
+):
+    import_dict, not_found_errors = _read_import_dict(*_import_file(project_id))
+    diff = perform_incremental_import(
+        import_dict, dry_run=dry_run, job_id=str(job.id) if job else None
+    )
+    if job:
+        job.report_progress(len(import_dict['projects']), len(import_dict['projects']))
+    return diff, not_found_errors
+
+
+@contextmanager
+def _running_job(job: ImportExportJob):
+    """Track the state of a job, recording any error which makes it fail."""
+    job.state = ImportExportJob.State.RUNNING
+    job.save(update_fields=['state', 'modified'])
+    try:
+        with job.reporting_progress():
+            yield
+    except APIException as e:
+        job.state = ImportExportJob.State.FAILED
+        job.errors = [*job.errors, str(e.detail)]
+    except Exception as e:
+        logger.exception(f'{job} failed')
+        job.state = ImportExportJob.State.FAILED
+        job.errors = [*job.errors, f'Unexpected error: {e}']
+    else:
+        job.state = ImportExportJob.State.SUCCEEDED
+    job.save()
+
+
 @shared_task
-def perform_import(import_dict):
-    new_projects: List[Project] = []
+def run_import_job(job_id: str, incremental: bool = False, dry_run: bool = False):
+    job = ImportExportJob.objects.get(id=job_id)
+    project_id = str(job.project_id) if job.project_id else None
+    with _running_job(job):
+        # missing files are reported as warnings, rather than failing the import
+        if incremental or dry_run:
+            job.result, job.warnings = import_data_incremental(project_id, dry_run=dry_run, job=job)
+        else:
+            job.warnings = import_data(project_id, job=job)
+
+
+def _reuse_evaluations(frames: List[Frame], previous_evaluations: Dict[str, dict]):
+    """Copy previous evaluations onto new frames whose file and evaluation model are unchanged."""
+    # only fingerprint frames which could match, since that may need a request to S3
+    previously_evaluated = {
+        (evaluation['frame__raw_path'], evaluation['evaluation_model'])
+        for evaluation in previous_evaluations.values()
+    }
+    candidates = []
+    for frame in frames:
+        model_name = frame.scan.experiment.project.evaluation_models.get(frame.scan.scan_type)
+        if (frame.raw_path, model_name) in previously_evaluated:
+            candidates.append((frame, model_name))
+
+    with ThreadPoolExecutor(max_workers=settings.S3_DOWNLOAD_WORKERS) as executor:
+        fingerprints = executor.map(lambda candidate: _frame_fingerprint(*candidate), candidates)
+        return [
+            Evaluation(
+                frame=frame,
+                evaluation_model=model_name,
+                results=previous_evaluations[fingerprint]['results'],
+                fingerprint=fingerprint,
+            )
+            for (frame, model_name), fingerprint in zip(candidates, fingerprints)
+            if fingerprint in previous_evaluations
+        ]
+
+
+def _imported_decisions(import_dict):
+    for project_data in import_dict['projects'].values():
+        for experiment_data in project_data['experiments'].values():
+            for scan_data in experiment_data['scans'].values():
+                yield from scan_data.get('decisions', [])
+                if scan_data.get('last_decision'):
+                    yield scan_data['last_decision']
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    """Parse a datetime string, only falling back to the slow dateparser for uncommon formats."""
+    try:
+        # covers ISO 8601, as well as '%Y-%m-%d %H:%M' and '%Y-%m-%d %H:%M:%S'
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return dateparser.parse(value)
+
+
+class _ScanDecisionBuilder:
+    """
+    Builds the ScanDecisions of one import.
+
+    The creators of all imported decisions are fetched with a single query, and each distinct
+    creation datetime string is only parsed once.
+    """
+
+    def __init__(self, import_dict):
+        emails = {
+            decision_data.get('creator') for decision_data in _imported_decisions(import_dict)
+        }
+        self.creators = {
+            user.email: user for user in User.objects.filter(email__in=emails - {None, ''})
+        }
+        self.default_created = (
+            datetime.now().strftime('%Y-%m-%d %H:%M')
+            if settings.REPLACE_NULL_CREATION_DATETIMES
+            else None
+        )
+        self._created: Dict[str, Optional[str]] = {}
+
+    def parse_created(self, value: str) -> Optional[str]:
+        if value not in self._created:
+            valid_dt = _parse_datetime(value)
+            self._created[value] = valid_dt.strftime('%Y-%m-%d %H:%M') if valid_dt else None
+        return self._created[value]
+
+    def has_created(self, decision_data) -> bool:
+        """Whether imported decision data has a valid creation datetime of its own."""
+        return bool(decision_data['created'] and self.parse_created(decision_data['created']))
+
+    def build(self, decision_data, scan_object: Scan) -> Optional[ScanDecision]:
+        """Build an unsaved ScanDecision from imported decision data, or None if it is invalid."""
+        if decision_data['decision'] not in [dec[0] for dec in DECISION_CHOICES]:
+            return None
+        created = self.default_created
+        location = {}
+        note = decision_data.get('note', '')
+        if decision_data['created']:
+            created = self.parse_created(decision_data['created']) or created
+        if decision_data['location'] and decision_data['location'] != '':
+            slices = [axis.split('=')[1] for axis in decision_data['location'].split(';')]
+            location = {
+                'i': slices[0],
+                'j': slices[1],
+                'k': slices[2],
+            }
+        return ScanDecision(
+            decision=decision_data['decision'],
+            creator=self.creators.get(decision_data.get('creator', '')),
+            created=created,
+            note=note or '',
+            user_identified_artifacts={
+                artifact_name: (
+                    1
+                    if decision_data['user_identified_artifacts']
+                    and artifact_name in decision_data['user_identified_artifacts']
+                    else 0
+                )
+                for artifact_name in default_identified_artifacts().keys()
+            },
+            location=location,
+            scan=scan_object,
+        )
+
+
+def _get_import_project(project_name: str) -> Project:
+    try:
+        return Project.objects.get(name=project_name)
+    except Project.DoesNotExist:
+        raise APIException(f'Project {project_name} does not exist.')
+
+
+def _clear_project(project_object: Project) -> Dict[str, dict]:
+    """Delete the imported objects of a project, returning its evaluations by fingerprint."""
+    # keep the results of the previous import, so unchanged frames are not evaluated again
+    previous_evaluations = {
+        evaluation['fingerprint']: evaluation
+        for evaluation in Evaluation.objects.filter(frame__scan__experiment__project=project_object)
+        .exclude(fingerprint='')
+        .values('fingerprint', 'frame__raw_path', 'evaluation_model', 'results')
+    }
+
+    # delete old imports of these projects
+    Experiment.objects.filter(
+        project=project_object
+    ).delete()  # cascades to scans -> frames, scan_notes
+    return previous_evaluations
+
+
+def _create_import_objects(
+    import_dict, previous_evaluations: Dict[str, dict], merge: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Create the experiments, scans, frames and decisions of an import dict.
+
+    With `merge`, experiments and scans which already exist (e.g. created from an earlier chunk
+    of the same import file) are added to rather than created again, and existing frames are
+    updated. Returns the ids of the frames which need to be evaluated, by project id.
+    """
     new_experiments: List[Experiment] = []
     new_scans: List[Scan] = []
     new_frames: List[Frame] = []
+    updated_frames: List[Frame] = []
     new_scan_decisions: List[ScanDecision] = []
+    decision_builder = _ScanDecisionBuilder(import_dict)
+    scans_with_frames: Set[UUID] = set()
 
     for project_name, project_data in import_dict['projects'].items():
-        try:
-            project_object = Project.objects.get(name=project_name)
-        except Project.DoesNotExist:
-            raise APIException(f'Project {project_name} does not exist.')
-
-        # delete old imports of these projects
-        Experiment.objects.filter(
-            project=project_object
-        ).delete()  # cascades to scans -> frames, scan_notes
+        project_object = _get_import_project(project_name)
+        experiments: Dict[str, Experiment] = {}
+        scans: Dict[Tuple[str, str], Scan] = {}
+        frames: Dict[Tuple[UUID, int], Frame] = {}
+        if merge:
+            experiments = {
+                experiment.name: experiment
+                for experiment in Experiment.objects.filter(
+                    project=project_object, name__in=project_data['experiments'].keys()
+                )
+            }
+            scans = {
+                (scan.experiment.name, scan.name): scan
+                for scan in Scan.objects.filter(
+                    experiment__in=experiments.values(),
+                    name__in={
+                        scan_name
+                        for experiment_data in project_data['experiments'].values()
+                        for scan_name in experiment_data['scans']
+                    },
+                ).select_related('experiment__project')
+            }
+            frames = {
+                (frame.scan_id, frame.frame_number): frame
+                for frame in Frame.objects.filter(scan__in=scans.values()).select_related(
+                    'scan__experiment__project'
+                )
+            }
 
         for experiment_name, experiment_data in project_data['experiments'].items():
-            notes = experiment_data.get('notes', '')
-            experiment_object = Experiment(
-                name=experiment_name,
-                project=project_object,
-                note=notes,
-            )
-            new_experiments.append(experiment_object)
+            experiment_object = experiments.get(experiment_name)
+            if experiment_object is None:
+                notes = experiment_data.get('notes', '')
+                experiment_object = Experiment(
+                    name=experiment_name,
+                    project=project_object,
+                    note=notes,
+                )
+                new_experiments.append(experiment_object)
 
             for scan_name, scan_data in experiment_data['scans'].items():
-                subject_id = scan_data.get('subject_id', None)
-                session_id = scan_data.get('session_id', None)
-                scan_link = scan_data.get('scan_link', None)
-                scan_object = Scan(
-                    name=scan_name,
-                    scan_type=scan_data['type'],
-                    experiment=experiment_object,
-                    subject_id=subject_id,
-                    session_id=session_id,
-                    scan_link=scan_link,
-                )
-                if 'last_decision' in scan_data and scan_data['last_decision']:
-                    scan_data['decisions'] = [scan_data['last_decision']]
-                for decision_data in scan_data.get('decisions', []):
-                    try:
-                        creator = User.objects.get(email=decision_data.get('creator', ''))
-                    except User.DoesNotExist:
-                        creator = None
-                    note = ''
-                    created = (
-                        datetime.now().strftime('%Y-%m-%d %H:%M')
-                        if settings.REPLACE_NULL_CREATION_DATETIMES
-                        else None
+                scan_object = scans.get((experiment_name, scan_name))
+                if scan_object is None:
+                    subject_id = scan_data.get('subject_id', None)
+                    session_id = scan_data.get('session_id', None)
+                    scan_link = scan_data.get('scan_link', None)
+                    scan_object = Scan(
+                        name=scan_name,
+                        scan_type=scan_data['type'],
+                        experiment=experiment_object,
+                        subject_id=subject_id,
+                        session_id=session_id,
+                        scan_link=scan_link,
                     )
-                    location = {}
-                    note = decision_data.get('note', '')
-                    if decision_data['created']:
-                        valid_dt = dateparser.parse(decision_data['created'])
-                        if valid_dt:
-                            created = valid_dt.strftime('%Y-%m-%d %H:%M')
-                    if decision_data['location'] and decision_data['location'] != '':
-                        slices = [
-                            axis.split('=')[1] for axis in decision_data['location'].split(';')
-                        ]
-                        location = {
-                            'i': slices[0],
-                            'j': slices[1],
-                            'k': slices[2],
-                        }
-                    if decision_data['decision'] in [dec[0] for dec in DECISION_CHOICES]:
-                        decision = ScanDecision(
-                            decision=decision_data['decision'],
-                            creator=creator,
-                            created=created,
-                            note=note or '',
-                            user_identified_artifacts={
-                                artifact_name: (
-                                    1
-                                    if decision_data['user_identified_artifacts']
-                                    and artifact_name in decision_data['user_identified_artifacts']
-                                    else 0
-                                )
-                                for artifact_name in default_identified_artifacts().keys()
-                            },
-                            location=location,
-                            scan=scan_object,
-                        )
-                        new_scan_decisions.append(decision)
-                new_scans.append(scan_object)
+                    if 'last_decision' in scan_data and scan_data['last_decision']:
+                        scan_data['decisions'] = [scan_data['last_decision']]
+                    for decision_data in scan_data.get('decisions', []):
+                        decision = decision_builder.build(decision_data, scan_object)
+                        if decision:
+                            new_scan_decisions.append(decision)
+                    new_scans.append(scan_object)
                 for frame_number, frame_data in scan_data['frames'].items():
                     if frame_data['file_location']:
-                        frame_object = Frame(
-                            frame_number=frame_number,
-                            raw_path=frame_data['file_location'],
-                            scan=scan_object,
-                        )
-                        new_frames.append(frame_object)
+                        frame_object = frames.get((scan_object.id, int(frame_number)))
+                        if frame_object is None:
+                            frame_object = Frame(
+                                frame_number=frame_number,
+                                raw_path=frame_data['file_location'],
+                                scan=scan_object,
+                            )
+                            new_frames.append(frame_object)
+                            scans_with_frames.add(scan_object.id)
+                        else:
+                            frame_object.raw_path = frame_data['file_location']
+                            updated_frames.append(frame_object)
                         if settings.ZARR_SUPPORT and Path(frame_object.raw_path).exists():
                             nifti_to_zarr_ngff.delay(frame_data['file_location'])
 
     # if any scan has no frames, it should not be created
-    new_scans = [
-        new_scan
-        for new_scan in new_scans
-        if any(new_frame.scan == new_scan for new_frame in new_frames)
+    new_scans = [new_scan for new_scan in new_scans if new_scan.id in scans_with_frames]
+    new_scan_decisions = [
+        decision for decision in new_scan_decisions if decision.scan_id in scans_with_frames
     ]
     # if any experiment has no scans, it should not be created
+    experiments_with_scans = {new_scan.experiment_id for new_scan in new_scans}
     new_experiments = [
         new_experiment
         for new_experiment in new_experiments
-        if any(new_scan.experiment == new_experiment for new_scan in new_scans)
+        if new_experiment.id in experiments_with_scans
     ]
 
-    Project.objects.bulk_create(new_projects)
     Experiment.objects.bulk_create(new_experiments)
     Scan.objects.bulk_create(new_scans)
     Frame.objects.bulk_create(new_frames)
+    Frame.objects.bulk_update(updated_frames, ['raw_path'])
     ScanDecision.objects.bulk_create(new_scan_decisions)
+    Scan.update_latest_decisions(
+        Scan.objects.filter(id__in={decision.scan_id for decision in new_scan_decisions})
+    )
+
+    changed_frames = new_frames + updated_frames
+    Evaluation.objects.filter(frame__in=updated_frames).delete()
+    reused_evaluations = _reuse_evaluations(changed_frames, previous_evaluations)
+    Evaluation.objects.bulk_create(reused_evaluations)
+    reused_frames = {evaluation.frame for evaluation in reused_evaluations}
 
     # must use str, not UUID, to get sent to celery task properly
     frames_by_project: Dict[str, List[str]] = {}
-    for frame in new_frames:
+    for frame in changed_frames:
+        if frame in reused_frames:
+            continue
         project_id = str(frame.scan.experiment.project.id)
         if project_id not in frames_by_project:
             frames_by_project[project_id] = []
         frames_by_project[project_id].append(str(frame.id))
-    evaluate_data.delay(frames_by_project)
+    return frames_by_project
+
+
+@shared_task
+def perform_import(import_dict, job_id: Optional[str] = None):
+    previous_evaluations: Dict[str, dict] = {}
+    projects = [_get_import_project(project_name) for project_name in import_dict['projects']]
+    for project_object in projects:
+        previous_evaluations.update(_clear_project(project_object))
+
+    frames_by_project = _create_import_objects(import_dict, previous_evaluations)
+    for project_object in projects:
+        ReviewProgress.update(project_object)
+    evaluate_data.delay(frames_by_project, job_id=job_id)
+
+
+def _decision_key(decision: ScanDecision, dated: bool = True):
+    """
+    Identify a decision by its content, so imported copies of existing decisions are skipped.
+
+    Imported decisions without a creation datetime are stamped with the import time (or not at
+    all), so their keys must leave out `created` to match the copy stored by a previous import.
+    """
+    key = (decision.scan_id, decision.decision, decision.creator_id, decision.note)
+    if not dated:
+        return key
+    created = decision.created
+    if isinstance(created, datetime):
+        created = timezone.localtime(created).strftime('%Y-%m-%d %H:%M')
+    return (*key, created)
+
+
+def perform_incremental_import(import_dict, dry_run: bool = False, job_id: Optional[str] = None):
+    """
+    Apply an import by diffing it against the existing objects of each project.
+
+    Experiments, scans and frames are matched by their natural keys (experiment name, scan name
+    and frame number), and only the objects which changed are created, updated or deleted, so
+    unchanged objects keep their ids, decisions and evaluations. Imported decisions are added
+    unless an identical decision already exists. Returns a report of the changes, keyed by
+    `project/experiment/scan/frame` paths; with `dry_run`, nothing is changed.
+    """
+    diff: Dict[str, Dict[str, List[str]]] = {
+        kind: {'created': [], 'updated': [], 'deleted': []}
+        for kind in ['experiments', 'scans', 'frames']
+    }
+    diff['decisions'] = {'created': []}
+    new_experiments: List[Experiment] = []
+    updated_experiments: List[Experiment] = []
+    deleted_experiments: List[Experiment] = []
+    new_scans: List[Scan] = []
+    updated_scans: List[Scan] = []
+    deleted_scans: List[Scan] = []
+    new_frames: List[Frame] = []
+    updated_frames: List[Frame] = []
+    deleted_frames: List[Frame] = []
+    new_scan_decisions: List[ScanDecision] = []
+    imported_projects: List[Project] = []
+    decision_builder = _ScanDecisionBuilder(import_dict)
+
+    with transaction.atomic():
+        for project_name, project_data in import_dict['projects'].items():
+            try:
+                project_object = Project.objects.select_for_update().get(name=project_name)
+            except Project.DoesNotExist:
+                raise APIException(f'Project {project_name} does not exist.')
+            imported_projects.append(project_object)
+
+            experiments = {
+                experiment.name: experiment
+                for experiment in Experiment.objects.filter(project=project_object)
+            }
+            scans = {
+                (scan.experiment.name, scan.name): scan
+                for scan in Scan.objects.filter(experiment__project=project_object).select_related(
+                    'experiment'
+                )
+            }
+            frames = {
+                (frame.scan.experiment.name, frame.scan.name, frame.frame_number): frame
+                for frame in Frame.objects.filter(
+                    scan__experiment__project=project_object
+                ).select_related('scan__experiment__project')
+            }
+            decision_keys = {
+                _decision_key(decision, dated)
+                for decision in ScanDecision.objects.filter(
+                    scan__experiment__project=project_object
+                )
+                for dated in [True, False]
+            }
+
+            for experiment_name, experiment_data in project_data['experiments'].items():
+                # scans without frames and experiments without scans are not imported
+                scans_data = {
+                    scan_name: scan_data
+                    for scan_name, scan_data in experiment_data['scans'].items()
+                    if any(
+                        frame_data['file_location'] for frame_data in scan_data['frames'].values()
+                    )
+                }
+                if not scans_data:
+                    continue
+
+                experiment_path = f'{project_name}/{experiment_name}'
+                notes = experiment_data.get('notes', '')
+                experiment_object = experiments.pop(experiment_name, None)
+                if experiment_object is None:
+                    experiment_object = Experiment(
+                        name=experiment_name,
+                        project=project_object,
+                        note=notes,
+                    )
+                    new_experiments.append(experiment_object)
+                    diff['experiments']['created'].append(experiment_path)
+                elif experiment_object.note != notes:
+                    experiment_object.note = notes
+                    updated_experiments.append(experiment_object)
+                    diff['experiments']['updated'].append(experiment_path)
+
+                for scan_name, scan_data in scans_data.items():
+                    scan_path = f'{experiment_path}/{scan_name}'
+                    scan_fields = {
+                        'scan_type': scan_data['type'],
+                        'subject_id': scan_data.get('subject_id', None),
+                        'session_id': scan_data.get('session_id', None),
+                        'scan_link': scan_data.get('scan_link', None),
+                    }
+                    scan_object = scans.pop((experiment_name, scan_name), None)
+                    if scan_object is None:
+                        scan_object = Scan(
+                            name=scan_name, experiment=experiment_object, **scan_fields
+                        )
+                        new_scans.append(scan_object)
+                        diff['scans']['created'].append(scan_path)
+                    elif any(
+                        getattr(scan_object, field) != value for field, value in scan_fields.items()
+                    ):
+                        for field, value in scan_fields.items():
+                            setattr(scan_object, field, value)
+                        updated_scans.append(scan_object)
+                        diff['scans']['updated'].append(scan_path)
+
+                    if 'last_decision' in scan_data and scan_data['last_decision']:
+                        scan_data['decisions'] = [scan_data['last_decision']]
+                    for decision_data in scan_data.get('decisions', []):
+                        decision = decision_builder.build(decision_data, scan_object)
+                        if decision is None:
+                            continue
+                        dated = decision_builder.has_created(decision_data)
+                        if _decision_key(decision, dated) not in decision_keys:
+                            decision_keys.update(
+                                {_decision_key(decision), _decision_key(decision, dated=False)}
+                            )
+                            new_scan_decisions.append(decision)
+                            diff['decisions']['created'].append(scan_path)
+
+                    for frame_number, frame_data in scan_data['frames'].items():
+                        if not frame_data['file_location']:
+                            continue
+                        frame_path = f'{scan_path}/{frame_number}'
+                        frame_object = frames.pop(
+                            (experiment_name, scan_name, int(frame_number)), None
+                        )
+                        if frame_object is None:
+                            frame_object = Frame(
+                                frame_number=frame_number,
+                                raw_path=frame_data['file_location'],
+                                scan=scan_object,
+                            )
+                            new_frames.append(frame_object)
+                            diff['frames']['created'].append(frame_path)
+                        elif frame_object.raw_path != frame_data['file_location']:
+                            frame_object.raw_path = frame_data['file_location']
+                            updated_frames.append(frame_object)
+                            diff['frames']['updated'].append(frame_path)
+
+            # anything left over is no longer part of the import
+            for experiment_name, experiment_object in experiments.items():
+                deleted_experiments.append(experiment_object)
+                diff['experiments']['deleted'].append(f'{project_name}/{experiment_name}')
+            for (experiment_name, scan_name), scan_object in scans.items():
+                deleted_scans.append(scan_object)
+                diff['scans']['deleted'].append(f'{project_name}/{experiment_name}/{scan_name}')
+            for (experiment_name, scan_name, frame_number), frame_object in frames.items():
+                deleted_frames.append(frame_object)
+                diff['frames']['deleted'].append(
+                    f'{project_name}/{experiment_name}/{scan_name}/{frame_number}'
+                )
+
+        if dry_run:
+            return diff
 
+        # deleting experiments and scans cascades to their remaining scans, frames and decisions
+        Frame.objects.filter(id__in=[frame.id for frame in deleted_frames]).delete()
+        Scan.objects.filter(id__in=[scan.id for scan in deleted_scans]).delete()
+        Experiment.objects.filter(
+            id__in=[experiment.id for experiment in deleted_experiments]
+        ).delete()
+
+        Experiment.objects.bulk_create(new_experiments)
+        Experiment.objects.bulk_update(updated_experiments, ['note'])
+        Scan.objects.bulk_create(new_scans)
+        Scan.objects.bulk_update(
+            updated_scans, ['scan_type', 'subject_id', 'session_id', 'scan_link']
+        )
+        Frame.objects.bulk_create(new_frames)
+        Frame.objects.bulk_update(updated_frames, ['raw_path'])
+        ScanDecision.objects.bulk_create(new_scan_decisions)
+        Scan.update_latest_decisions(
+            Scan.objects.filter(id__in={decision.scan_id for decision in new_scan_decisions})
+        )
 
-def export_data(project_id: Optional[str]):
+        # frames which now point to another file must be evaluated again
+        changed_frames = new_frames + updated_frames
+        Evaluation.objects.filter(frame__in=updated_frames).delete()
+        previous_evaluations = {
+            evaluation['fingerprint']: evaluation
+            for evaluation in Evaluation.objects.filter(
+                frame__raw_path__in={frame.raw_path for frame in changed_frames}
+            )
+            .exclude(fingerprint='')
+            .values('fingerprint', 'frame__raw_path', 'evaluation_model', 'results')
+        }
+        reused_evaluations = _reuse_evaluations(changed_frames, previous_evaluations)
+        Evaluation.objects.bulk_create(reused_evaluations)
+        reused_frames = {evaluation.frame for evaluation in reused_evaluations}
+        for project_object in imported_projects:
+            ReviewProgress.update(project_object)
+
+    frames_by_project: Dict[str, List[str]] = {}
+    for frame in changed_frames:
+        if settings.ZARR_SUPPORT and Path(frame.raw_path).exists():
+            nifti_to_zarr_ngff.delay(frame.raw_path)
+        if frame in reused_frames:
+            continue
+        project_id = str(frame.scan.experiment.project.id)
+        frames_by_project.setdefault(project_id, []).append(str(frame.id))
+    evaluate_data.delay(frames_by_project, job_id=job_id)
+    return diff
+
+
+def export_data(project_id: Optional[str], job: Optional[ImportExportJob] = None):
     if not project_id:
         export_path = GlobalSettings.load().export_path
     else:
         project = Project.objects.get(id=project_id)
         export_path = project.export_path
     parent_location = Path(export_path).parent
-    if not parent_location.exists():
+    if not export_path.startswith('s3://') and not parent_location.exists():
         raise APIException(f'No such location {parent_location} to create export file.')
 
-    return perform_export(project_id)
+    return perform_export(project_id, job=job)
 
 
-@shared_task
-def perform_export(project_id: Optional[str]):
-    data = {'projects': {}}
-    export_warnings = []
+def _opening_export_file(export_path: str) -> ContextManager[BinaryIO]:
+    if export_path.startswith('s3://'):
+        # stream the export to S3 in parts, rather than staging all of it on disk
+        return upload_s3_file(export_path)
+    return open(export_path, 'wb')
+
+
+def _export_decision(decision_object: ScanDecision) -> dict:
+    location = None
+    if decision_object.location:
+        location = (
+            f'i={decision_object.location["i"]};'
+            f'j={decision_object.location["j"]};'
+            f'k={decision_object.location["k"]}'
+        )
+    artifacts = ';'.join(
+        [
+            artifact
+            for artifact, value in decision_object.user_identified_artifacts.items()
+            if value == 1
+        ]
+    )
+    return {
+        'decision': decision_object.decision,
+        'creator': decision_object.creator.username if decision_object.creator else None,
+        'note': decision_object.note,
+        'created': (
+            datetime.strftime(decision_object.created, '%Y-%m-%d %H:%M:%S')
+            if decision_object.created
+            else None
+        ),
+        'user_identified_artifacts': artifacts if len(artifacts) > 0 else None,
+        'location': location,
+    }
+
+
+def _export_experiment(experiment_object: Experiment, latest_decisions: bool = False) -> dict:
+    def scan_decisions(scan_object: Scan) -> Iterable[ScanDecision]:
+        if latest_decisions:
+            return [scan_object.latest_decision] if scan_object.latest_decision else []
+        return scan_object.decisions.all()
+
+    return {
+        'scans': {
+            scan_object.name: {
+                'frames': {
+                    frame_object.frame_number: {'file_location': frame_object.raw_path}
+                    for frame_object in scan_object.frames.all()
+                },
+                'decisions': [
+                    _export_decision(decision_object)
+                    for decision_object in scan_decisions(scan_object)
+                ],
+                'type': scan_object.scan_type,
+                'subject_id': scan_object.subject_id,
+                'session_id': scan_object.session_id,
+                'scan_link': scan_object.scan_link,
+            }
+            for scan_object in experiment_object.scans.all()
+        },
+        'notes': experiment_object.note,
+    }
+
+
+def _export_experiment_chunks(
+    project_object: Project, latest_decisions: bool = False
+) -> Iterator[Dict[str, dict]]:
+    """
+    Yield the export data of the experiments of a project, `EXPORT_CHUNK_SIZE` at a time.
 
+    The scans, frames and decisions of each chunk are fetched together, so an export takes a few
+    queries per chunk however many objects the chunk contains. With `latest_decisions`, only the
+    latest decision of each scan is exported, which is joined to the scans.
+    """
+    experiments = project_object.experiments.all().iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(experiments, settings.EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        if latest_decisions:
+            prefetch_related_objects(
+                chunk,
+                Prefetch('scans', queryset=Scan.objects.select_related('latest_decision__creator')),
+                'scans__frames',
+            )
+        else:
+            prefetch_related_objects(
+                chunk,
+                'scans__frames',
+                Prefetch(
+                    'scans__decisions', queryset=ScanDecision.objects.select_related('creator')
+                ),
+            )
+        yield {
+            experiment_object.name: _export_experiment(experiment_object, latest_decisions)
+            for experiment_object in chunk
+        }
+
+
+def _export_projects(
+    projects: List[Project], job: Optional[ImportExportJob] = None, latest_decisions: bool = False
+) -> Iterator[Tuple[str, Iterator[Dict[str, dict]]]]:
+    for project_index, project_object in enumerate(projects):
+        if job:
+            job.report_progress(project_index, len(projects))
+        yield project_object.name, _export_experiment_chunks(project_object, latest_decisions)
+    if job:
+        job.report_progress(len(projects), len(projects))
+
+
+def iter_export_csv(
+    projects: List[Project], job: Optional[ImportExportJob] = None
+) -> Iterator[str]:
+    """Generate an export CSV file piece by piece, without holding the whole export in memory."""
+    yield f'{",".join(IMPORT_CSV_COLUMNS)}\n'
+    # a CSV file only holds the latest decision of each scan
+    for project_name, experiment_chunks in _export_projects(projects, job, latest_decisions=True):
+        for experiments in experiment_chunks:
+            chunk_dict = {'projects': {project_name: {'experiments': experiments}}}
+            yield import_dict_to_dataframe(chunk_dict).to_csv(index=False, header=False)
+
+
+def iter_export_json(
+    projects: List[Project], job: Optional[ImportExportJob] = None
+) -> Iterator[str]:
+    """Generate an export JSON file piece by piece, without holding the whole export in memory."""
+    yield '{"projects": {'
+    for project_index, (project_name, experiment_chunks) in enumerate(
+        _export_projects(projects, job)
+    ):
+        separator = ', ' if project_index > 0 else ''
+        yield f'{separator}{json.dumps(project_name)}: {{"experiments": {{'
+        separator = ''
+        for experiments in experiment_chunks:
+            for experiment_name, experiment_data in experiments.items():
+                yield f'{separator}{json.dumps(experiment_name)}: {json.dumps(experiment_data)}'
+                separator = ', '
+        yield '}}'
+    yield '}}'
+
+
+def perform_export(project_id: Optional[str], job: Optional[ImportExportJob] = None):
     if project_id is None:
         # A global export should export all projects
-        project = None
-        projects = list(Project.objects.all())
+        projects = list(Project.objects.order_by('name'))
         export_path = GlobalSettings.load().export_path
     else:
         # A normal export should only export the current project
@@ -335,70 +1174,29 @@ def perform_export(project_id: Optional[str]):
         projects = [project]
         export_path = project.export_path
 
-    for project_object in projects:
-        project_data = {'experiments': {}}
-        for experiment_object in project_object.experiments.all():
-            experiment_data = {'scans': {}, 'notes': experiment_object.note}
-            for scan_object in experiment_object.scans.all():
-                scan_data = {
-                    'frames': {},
-                    'decisions': [],
-                    'type': scan_object.scan_type,
-                    'subject_id': scan_object.subject_id,
-                    'session_id': scan_object.session_id,
-                    'scan_link': scan_object.scan_link,
-                }
-                for frame_object in scan_object.frames.all():
-                    scan_data['frames'][frame_object.frame_number] = {
-                        'file_location': frame_object.raw_path
-                    }
-                for decision_object in scan_object.decisions.all():
-                    location = None
-                    if decision_object.location:
-                        location = (
-                            f'i={decision_object.location["i"]};'
-                            f'j={decision_object.location["j"]};'
-                            f'k={decision_object.location["k"]}'
-                        )
-                    artifacts = ';'.join(
-                        [
-                            artifact
-                            for artifact, value in decision_object.user_identified_artifacts.items()
-                            if value == 1
-                        ]
-                    )
-                    scan_data['decisions'].append(
-                        {
-                            'decision': decision_object.decision,
-                            'creator': decision_object.creator.username
-                            if decision_object.creator
-                            else None,
-                            'note': decision_object.note,
-                            'created': datetime.strftime(
-                                decision_object.created, '%Y-%m-%d %H:%M:%S'
-                            )
-                            if decision_object.created
-                            else None,
-                            'user_identified_artifacts': artifacts if len(artifacts) > 0 else None,
-                            'location': location,
-                        }
-                    )
-                experiment_data['scans'][scan_object.name] = scan_data
-            project_data['experiments'][experiment_object.name] = experiment_data
-        data['projects'][project_object.name] = project_data
-    data, export_warnings = validate_import_dict(data, project)
+    uncompressed_path, _ = split_compression(export_path)
+    if uncompressed_path.endswith('csv'):
+        export_chunks = iter_export_csv(projects, job)
+    elif uncompressed_path.endswith('json'):
+        export_chunks = iter_export_json(projects, job)
+    else:
+        raise APIException(
+            f'Unknown format for export path {export_path}. Expected csv or json, '
+            'optionally compressed with gzip (.gz) or zstd (.zst).'
+        )
 
     try:
-        if export_path.endswith('csv'):
-            export_df = import_dict_to_dataframe(data)
-            export_df.to_csv(export_path, index=False)
-        elif export_path.endswith('json'):
-            with open(export_path, 'w') as fd:
-                json.dump(data, fd)
-        else:
-            raise APIException(
-                f'Unknown format for export path {export_path}. Expected csv or json.'
-            )
+        with _opening_export_file(export_path) as raw, open_text(raw, export_path, 'w') as fd:
+            fd.writelines(export_chunks)
     except PermissionError:
         raise APIException(f'MIQA lacks permission to write to {export_path}.')
-    return export_warnings
+    except (ClientError, boto3.exceptions.Boto3Error):
+        raise APIException(f'Could not upload export file to {export_path}.')
+
+
+@shared_task
+def run_export_job(job_id: str):
+    job = ImportExportJob.objects.get(id=job_id)
+    project_id = str(job.project_id) if job.project_id else None
+    with _running_job(job):
+        export_data(project_id, job=job)
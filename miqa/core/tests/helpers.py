@@ -1,19 +1,32 @@
 import csv
 import io
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
+from miqa.core.conversion.import_export_csvs import IMPORT_CSV_COLUMNS
 
-def generate_import_csv(sample_scans):
+REQUIRED_IMPORT_CSV_COLUMNS = IMPORT_CSV_COLUMNS[:6]
+
+
+def generate_import_csv(
+    sample_scans=(), rows: Iterable[Dict] = (), columns: Optional[List[str]] = None
+):
+    """
+    Generate an import CSV with a frame of each sample scan, followed by any other `rows`.
+
+    Each row maps column names to values, and columns missing from a row are left empty. By
+    default, the CSV has the required columns and any optional columns used by the rows.
+    """
+    rows = list(rows)
+    if columns is None:
+        used = {column for row in rows for column in row}
+        columns = [
+            column
+            for column in IMPORT_CSV_COLUMNS
+            if column in REQUIRED_IMPORT_CSV_COLUMNS or column in used
+        ]
     output = io.StringIO()
-    fieldnames = [
-        'project_name',
-        'experiment_name',
-        'scan_name',
-        'scan_type',
-        'frame_number',
-        'file_location',
-    ]
-    writer = csv.DictWriter(output, fieldnames=fieldnames, dialect='unix')
+    writer = csv.DictWriter(output, fieldnames=columns, dialect='unix')
     writer.writeheader()
     for scan_folder, scan_id, scan_type in sample_scans:
         # The project name is encoded somewhere in the path
@@ -30,6 +43,7 @@ def generate_import_csv(sample_scans):
                 'file_location': f'{scan_folder}/{scan_id}_{scan_type}/image.nii.gz',
             }
         )
+    writer.writerows(rows)
 
     return output, writer
 
@@ -0,0 +1,180 @@
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+import pytest
+
+from miqa.core.file_cache import FileCache
+from miqa.core.models import Evaluation, EvaluationRun, ImportExportJob
+from miqa.core.tasks import (
+    _evaluate_frames,
+    _frames_by_model,
+    evaluate_data,
+    evaluate_frame_content,
+)
+
+
+@pytest.fixture
+def example_frame_factory(project, experiment_factory, scan_factory, frame_factory):
+    def _make_frames(count, project=project):
+        example_path = str(Path(__file__).parent / 'data' / 'example.nii.gz')
+        experiment = experiment_factory(project=project)
+        return [
+            frame_factory(
+                scan=scan_factory(experiment=experiment, scan_type='T1'), raw_path=example_path
+            )
+            for _ in range(count)
+        ]
+
+    return _make_frames
+
+
+@pytest.fixture
+def example_frames(example_frame_factory):
+    return example_frame_factory(5)
+
+
+@pytest.mark.django_db
+def test_evaluate_data_fans_out_chunks(mocker, settings, project, example_frames):
+    settings.EVALUATION_CHUNK_SIZE = 2
+    evaluate_frames = mocker.patch('miqa.core.tasks._evaluate_frames')
+
+    evaluate_data({str(project.id): [str(frame.id) for frame in example_frames]})
+
+    assert evaluate_frames.call_count == 3
+    assert sorted(len(call.args[1]) for call in evaluate_frames.call_args_list) == [1, 2, 2]
+    run = EvaluationRun.objects.get()
+    assert str(run.project_id) == project.id
+    assert run.job is None
+    assert run.total_chunks == 3
+    assert run.completed_chunks == 3
+    assert run.total_frames == 5
+    assert run.evaluated_frames == 5
+    assert run.completed is not None
+
+
+@pytest.mark.django_db
+def test_evaluate_data_records_job(
+    mocker, project, project_factory, user, example_frames, example_frame_factory
+):
+    mocker.patch('miqa.core.tasks._evaluate_frames')
+    job = ImportExportJob.objects.create(
+        kind=ImportExportJob.Kind.IMPORT, project=project, creator=user
+    )
+    other_project = project_factory()
+    other_frames = example_frame_factory(1, project=other_project)
+
+    evaluate_data(
+        {
+            str(project.id): [str(frame.id) for frame in example_frames],
+            str(other_project.id): [str(frame.id) for frame in other_frames],
+        },
+        job_id=str(job.id),
+    )
+
+    run = EvaluationRun.objects.get()
+    # a run spanning several projects, as from a global import, belongs to none of them
+    assert run.project is None
+    assert run.job == job
+    assert run.total_frames == 6
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('frame_count', [1, 20])
+def test_frames_by_model_query_count(
+    django_assert_num_queries, project, example_frame_factory, frame_count
+):
+    frame_ids = [str(frame.id) for frame in example_frame_factory(frame_count)]
+
+    with django_assert_num_queries(1):
+        frames_by_model = _frames_by_model({str(project.id): frame_ids})
+
+    assert list(frames_by_model.keys()) == [project.evaluation_models['T1']]
+    assert sorted(frames_by_model[project.evaluation_models['T1']]) == sorted(frame_ids)
+
+
+@pytest.mark.django_db
+def test_evaluate_frames_s3(mocker, settings, tmp_path, project, scan_factory, frame_factory):
+    pytest.importorskip('torch')
+    settings.S3_SUPPORT = True
+    settings.EVALUATION_BATCH_SIZE = 2
+    mocker.patch('miqa.core.tasks._get_file_cache', return_value=FileCache(tmp_path, 1024**2))
+    client = mocker.patch('miqa.core.tasks.get_s3_client').return_value
+    client.head_object.return_value = {'ETag': '"etag"'}
+    client.download_file.side_effect = lambda bucket, key, dest: Path(dest).write_text(key)
+    mocker.patch('miqa.learning.evaluation_models.NNModel.get')
+    evaluate_many = mocker.patch(
+        'miqa.learning.nn_inference.evaluate_many',
+        side_effect=lambda model, image_paths, **kwargs: {
+            image_path: {'overall_quality': 0.5} for image_path in image_paths
+        },
+    )
+    scan = scan_factory(experiment__project=project, scan_type='T1')
+    frames = [
+        frame_factory(scan=scan, raw_path=f's3://bucket/{index}.nii.gz') for index in range(5)
+    ]
+
+    _evaluate_frames(project.evaluation_models['T1'], frames)
+
+    # each file is only looked up once, and all frames are evaluated in one go
+    assert client.head_object.call_count == 5
+    assert client.download_file.call_count == 5
+    assert evaluate_many.call_count == 1
+    evaluations = Evaluation.objects.filter(frame__in=frames)
+    assert len(evaluations) == 5
+    assert all(evaluation.results == {'overall_quality': 0.5} for evaluation in evaluations)
+    assert all(evaluation.fingerprint for evaluation in evaluations)
+
+
+@pytest.mark.django_db
+def test_evaluate_frame_content_s3(
+    mocker, settings, tmp_path, project, scan_factory, frame_factory
+):
+    pytest.importorskip('torch')
+    settings.S3_SUPPORT = True
+    mocker.patch('miqa.core.tasks._get_file_cache', return_value=FileCache(tmp_path, 1024**2))
+    client = mocker.patch('miqa.core.tasks.get_s3_client').return_value
+    client.head_object.return_value = {'ETag': '"etag"'}
+    client.download_file.side_effect = lambda bucket, key, dest: Path(dest).write_text(key)
+    mocker.patch('miqa.learning.evaluation_models.NNModel.get')
+    evaluate1 = mocker.patch(
+        'miqa.learning.nn_inference.evaluate1', return_value={'overall_quality': 0.5}
+    )
+    frame = frame_factory(
+        scan=scan_factory(experiment__project=project, scan_type='T1'),
+        raw_path='s3://bucket/frame.nii.gz',
+    )
+
+    evaluate_frame_content(str(frame.id))
+
+    # the ETag which versions the evaluation is also the one downloaded
+    assert client.head_object.call_count == 1
+    assert client.download_file.call_count == 1
+    assert evaluate1.call_count == 1
+    evaluation = Evaluation.objects.get(frame=frame)
+    assert evaluation.results == {'overall_quality': 0.5}
+    assert evaluation.fingerprint
+
+
+@pytest.mark.django_db
+def test_evaluate_frame_content_s3_missing(
+    mocker, settings, tmp_path, project, scan_factory, frame_factory
+):
+    pytest.importorskip('torch')
+    settings.S3_SUPPORT = True
+    mocker.patch('miqa.core.tasks._get_file_cache', return_value=FileCache(tmp_path, 1024**2))
+    client = mocker.patch('miqa.core.tasks.get_s3_client').return_value
+    client.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+    mocker.patch('miqa.learning.evaluation_models.NNModel.get')
+    evaluate1 = mocker.patch('miqa.learning.nn_inference.evaluate1')
+    frame = frame_factory(
+        scan=scan_factory(experiment__project=project, scan_type='T1'),
+        raw_path='s3://bucket/missing.nii.gz',
+    )
+
+    with pytest.raises(FileNotFoundError, match='s3://bucket/missing.nii.gz'):
+        evaluate_frame_content(str(frame.id))
+
+    assert client.head_object.call_count == 1
+    assert not client.download_file.called
+    assert not evaluate1.called
+    assert not Evaluation.objects.filter(frame=frame).exists()
@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('torch')
+
+from miqa.learning.evaluation_models import (  # noqa: E402
+    EvaluationModelCache,
+    NNModel,
+    _available_memory,
+)
+
+
+class WeightsFileModel(NNModel):
+    """An NNModel reading its weights from any path, rather than the bundled models directory."""
+
+    def __init__(self, weights: Path):
+        super().__init__(weights.name, [])
+        self.weights = weights
+
+    @property
+    def path(self) -> Path:
+        return self.weights
+
+
+@pytest.fixture
+def load_model(mocker):
+    # loading returns a new object each time, standing in for the network
+    return mocker.patch(
+        'miqa.learning.evaluation_models.get_model', side_effect=lambda path: object()
+    )
+
+
+@pytest.fixture
+def make_model(tmp_path):
+    def _make_model(name: str) -> WeightsFileModel:
+        weights = tmp_path / f'{name}.pth'
+        weights.write_bytes(b'weights')
+        return WeightsFileModel(weights)
+
+    return _make_model
+
+
+def test_model_cache_hit(load_model, make_model):
+    cache = EvaluationModelCache()
+    model = make_model('model')
+
+    assert cache.get(model) is cache.get(model)
+    assert load_model.call_count == 1
+
+
+def test_model_cache_evicts_least_recently_used(load_model, make_model):
+    cache = EvaluationModelCache(max_size=2, min_available_memory=0)
+    first, second, third = make_model('first'), make_model('second'), make_model('third')
+
+    cache.get(first)
+    cache.get(second)
+    # using the first model again makes the second one the least recently used
+    cache.get(first)
+    cache.get(third)
+
+    assert len(cache) == 2
+    assert first in cache
+    assert second not in cache
+    assert third in cache
+
+
+def test_model_cache_reloads_changed_weights(load_model, make_model):
+    cache = EvaluationModelCache()
+    model = make_model('model')
+    loaded = cache.get(model)
+
+    model.path.write_bytes(b'retrained weights')
+    assert cache.get(model) is not loaded
+    reloaded = cache.get(model)
+
+    # a changed modification time alone also counts as a new version
+    stat = model.path.stat()
+    os.utime(model.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(model) is not reloaded
+    assert load_model.call_count == 3
+
+
+def test_model_cache_low_memory(mocker, load_model, make_model):
+    available_memory = mocker.patch(
+        'miqa.learning.evaluation_models._available_memory', return_value=None
+    )
+    cache = EvaluationModelCache(max_size=3, min_available_memory=1024)
+    first, second, third = make_model('first'), make_model('second'), make_model('third')
+
+    # platforms which do not report the available memory only evict by count
+    cache.get(first)
+    cache.get(second)
+    assert len(cache) == 2
+
+    # with too little memory left, loading a model evicts all the others
+    available_memory.return_value = 512
+    cache.get(third)
+    assert third in cache
+    assert len(cache) == 1
+
+
+def test_available_memory(tmp_path):
+    meminfo = tmp_path / 'meminfo'
+    meminfo.write_text(
+        'MemTotal:        8000000 kB\n'
+        'MemFree:          400000 kB\n'
+        'MemAvailable:    5468160 kB\n'
+        'Buffers:          100000 kB\n'
+    )
+
+    # reclaimable memory, like the page cache, counts as available
+    assert _available_memory(meminfo) == 5468160 * 1024
+    # e.g. kernels before 3.14, or other platforms
+    meminfo.write_text('MemTotal:        8000000 kB\nMemFree:          400000 kB\n')
+    assert _available_memory(meminfo) is None
+    assert _available_memory(tmp_path / 'missing') is None
@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from miqa.core.file_cache import FileCache
+
+
+def _fetch_bytes(content: bytes):
+    def fetch(dest: Path):
+        dest.write_bytes(content)
+
+    return fetch
+
+
+def test_file_cache_hit(tmp_path):
+    cache = FileCache(tmp_path, max_size=1024)
+    fetches = []
+
+    def fetch(dest: Path):
+        fetches.append(dest)
+        dest.write_bytes(b'image')
+
+    first = cache.get('s3://bucket/image.nii.gz@"etag"', fetch, suffix='.nii.gz')
+    second = cache.get('s3://bucket/image.nii.gz@"etag"', fetch, suffix='.nii.gz')
+
+    assert first == second
+    assert first.name.endswith('.nii.gz')
+    assert first.read_bytes() == b'image'
+    assert len(fetches) == 1
+
+
+def test_file_cache_changed_key(tmp_path):
+    cache = FileCache(tmp_path, max_size=1024)
+
+    old = cache.get('s3://bucket/image.nii.gz@"old"', _fetch_bytes(b'old'))
+    new = cache.get('s3://bucket/image.nii.gz@"new"', _fetch_bytes(b'new'))
+
+    assert old != new
+    assert new.read_bytes() == b'new'
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    cache = FileCache(tmp_path, max_size=20)
+
+    first = cache.get('first', _fetch_bytes(b'x' * 10))
+    second = cache.get('second', _fetch_bytes(b'x' * 10))
+    # filesystem timestamps may be too coarse to order the files, so age them explicitly
+    os.utime(first, (0, 0))
+    os.utime(second, (1, 1))
+    # using the first file again makes the second one the least recently used
+    cache.get('first', _fetch_bytes(b'x' * 10))
+    third = cache.get('third', _fetch_bytes(b'x' * 10))
+
+    assert first.exists()
+    assert not second.exists()
+    assert third.exists()
+
+
+def test_file_cache_failed_fetch(tmp_path):
+    cache = FileCache(tmp_path, max_size=1024)
+
+    def fetch(dest: Path):
+        dest.write_bytes(b'partial')
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        cache.get('broken', fetch)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_cache_tracks_size(mocker, tmp_path):
+    cache = FileCache(tmp_path, max_size=1024)
+    scandir = mocker.spy(os, 'scandir')
+
+    for index in range(5):
+        cache.get(str(index), _fetch_bytes(b'x' * 10))
+
+    # the directory is only scanned for the initial size, until the cache is over budget
+    assert scandir.call_count == 1
+    cache.max_size = 40
+    cache.get('over budget', _fetch_bytes(b'x' * 10))
+    assert scandir.call_count == 2
+
+
+def test_file_cache_keeps_files_in_use(tmp_path):
+    cache = FileCache(tmp_path, max_size=10)
+
+    with cache.holding() as hold:
+        held = hold(cache.get('held', _fetch_bytes(b'x' * 10)))
+        old = cache.get('old', _fetch_bytes(b'x' * 10))
+        os.utime(held, (0, 0))
+        os.utime(old, (1, 1))
+        recent = cache.get('recent', _fetch_bytes(b'x' * 10))
+
+        # held and recently used files are kept, even though the cache is over budget
+        assert held.exists()
+        assert not old.exists()
+        assert recent.exists()
+
+    cache.get('next', _fetch_bytes(b'x' * 10))
+
+    assert not held.exists()
+    assert recent.exists()
@@ -1,14 +1,39 @@
+import gzip
 import json
 from pathlib import Path
 import re
 
-from guardian.shortcuts import get_perms
+from botocore.exceptions import ClientError
+from guardian.shortcuts import assign_perm, get_perms
+import pandas
 import pytest
 from rest_framework.exceptions import APIException
 
-from miqa.core.conversion.import_export_csvs import IMPORT_CSV_COLUMNS
-from miqa.core.models import Frame, GlobalSettings
-from miqa.core.tasks import import_data
+from miqa.core.compression import open_text
+from miqa.core.conversion.import_export_csvs import (
+    IMPORT_CSV_COLUMNS,
+    find_missing_files,
+    import_dict_to_dataframe,
+    validate_import_dict,
+)
+from miqa.core.models import (
+    Evaluation,
+    Experiment,
+    Frame,
+    GlobalSettings,
+    ImportExportJob,
+    Scan,
+    ScanDecision,
+)
+from miqa.core.tasks import (
+    _frame_fingerprint,
+    _parse_datetime,
+    _ScanDecisionBuilder,
+    import_data,
+    import_data_incremental,
+    perform_export,
+    run_import_job,
+)
 from miqa.core.tests.helpers import generate_import_csv, generate_import_json
 
 
@@ -23,7 +48,8 @@ def test_import_empty_csv(tmp_path, user, project_factory, user_api_client):
 
     resp = user_api_client.post(f'/api/v1/projects/{project.id}/import')
     if get_perms(user, project):
-        assert resp.status_code == 204
+        assert resp.status_code == 202
+        assert resp.data['state'] == 'succeeded'
         project.refresh_from_db()
         assert project.experiments.count() == 0
     else:
@@ -42,7 +68,8 @@ def test_import_csv(tmp_path, user, project_factory, sample_scans, user_api_clie
 
     resp = user_api_client.post(f'/api/v1/projects/{project.id}/import')
     if get_perms(user, project):
-        assert resp.status_code == 204
+        assert resp.status_code == 202
+        assert resp.data['state'] == 'succeeded'
         project.refresh_from_db()
         assert project.experiments.count() == 1
         assert project.experiments.all()[0].scans.count() == 1
@@ -59,7 +86,8 @@ def test_import_csv_optional_columns(user, project_factory, user_api_client):
 
     resp = user_api_client.post(f'/api/v1/projects/{project.id}/import')
     if get_perms(user, project):
-        assert resp.status_code == 204
+        assert resp.status_code == 202
+        assert resp.data['state'] == 'succeeded'
         project.refresh_from_db()
         assert project.experiments.count() == 2
         assert project.experiments.all()[0].scans.count() == 1
@@ -84,7 +112,8 @@ def test_import_global_csv(tmp_path, user, project_factory, sample_scans, user_a
     project_ucsd = project_factory(name='ucsd')
 
     resp = user_api_client().post('/api/v1/global/import')
-    assert resp.status_code == 204
+    assert resp.status_code == 202
+    assert resp.data['state'] == 'succeeded'
     project_ohsu.refresh_from_db()
     project_ucsd.refresh_from_db()
     assert project_ohsu.experiments.count() == 1
@@ -117,7 +146,8 @@ def test_import_json(
 
     resp = user_api_client(project=project).post(f'/api/v1/projects/{project.id}/import')
     if get_perms(user, project):
-        assert resp.status_code == 204
+        assert resp.status_code == 202
+        assert resp.data['state'] == 'succeeded'
         project.refresh_from_db()
         assert project.experiments.count() == 1
         assert project.experiments.all()[0].scans.count() == 1
@@ -147,7 +177,8 @@ def test_import_global_json(
     project_ucsd = project_factory(import_path=json_file, name='ucsd')
 
     resp = user_api_client().post('/api/v1/global/import')
-    assert resp.status_code == 204
+    assert resp.status_code == 202
+    assert resp.data['state'] == 'succeeded'
     # The import should update the correctly named projects, but not the original import project
     project_ohsu.refresh_from_db()
     project_ucsd.refresh_from_db()
@@ -217,6 +248,95 @@ def test_import_invalid_json(
         import_data(project.id)
 
 
+@pytest.mark.django_db
+def test_validate_import_dict(project_factory):
+    project = project_factory(import_path=str(Path(__file__).parent / 'data' / 'import.json'))
+    import_dict = {
+        'projects': {
+            project.name: {
+                'experiments': {
+                    'experiment': {
+                        'notes': 'notes',
+                        'scans': {
+                            'scan': {
+                                'type': 'T1',
+                                'frames': {'0': {'file_location': 'data/example.nii.gz'}},
+                                'last_decision': None,
+                            },
+                            'missing': {'type': 'T1', 'frames': {'1': {'file_location': 'nope'}}},
+                        },
+                    }
+                }
+            }
+        }
+    }
+
+    validated, not_found_errors = validate_import_dict(import_dict, project)
+
+    scans = validated['projects'][project.name]['experiments']['experiment']['scans']
+    assert scans['scan']['frames'] == {
+        0: {'file_location': str(Path(__file__).parent / 'data' / 'example.nii.gz')}
+    }
+    assert not_found_errors == [f'File not found: {Path(__file__).parent / "nope"}']
+
+
+@pytest.mark.django_db
+def test_validate_import_dict_reports_all_errors(project_factory):
+    project = project_factory(import_path='/import.json')
+    scans = {
+        'no_type': {'frames': {'0': {'file_location': 's3://bucket/a.nii.gz'}}},
+        'bad_frame': {'type': 'T1', 'frames': {'first': {'file_location': 's3://bucket/b.nii.gz'}}},
+        'no_frames': {'type': 'T1', 'frames': {}, 'subject_id': 1},
+    }
+    import_dict = {'projects': {project.name: {'experiments': {'e': {'scans': scans}}}}}
+
+    with pytest.raises(APIException) as excinfo:
+        validate_import_dict(import_dict, project)
+
+    prefix = f'projects/{project.name}/experiments/e/scans'
+    message = str(excinfo.value)
+    assert f"{prefix}/no_type: missing keys 'type'" in message
+    assert f"{prefix}/bad_frame/frames/first: invalid frame number 'first'" in message
+    assert f'{prefix}/no_frames/frames: must not be empty' in message
+    assert f"{prefix}/no_frames/subject_id: 1 should be instance of 'str'" in message
+
+
+def test_find_missing_files(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'a' / 'present.nii.gz').touch()
+    locations = [
+        tmp_path / 'a' / 'present.nii.gz',
+        tmp_path / 'a' / 'missing.nii.gz',
+        tmp_path / 'b' / 'missing.nii.gz',
+        's3://bucket/unchecked.nii.gz',
+    ]
+
+    assert find_missing_files(locations) == {
+        tmp_path / 'a' / 'missing.nii.gz',
+        tmp_path / 'b' / 'missing.nii.gz',
+    }
+
+
+def test_find_missing_s3_files(mocker, settings):
+    settings.IMPORT_CHECK_S3_FILES = True
+    client = mocker.Mock()
+    client.get_paginator.return_value.paginate.return_value = [
+        {'Contents': [{'Key': 'scans/a.nii.gz'}, {'Key': 'scans/unrelated.nii.gz'}]}
+    ]
+    client.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+    mocker.patch('miqa.core.conversion.import_export_csvs.get_s3_client', return_value=client)
+
+    missing = find_missing_files(
+        ['s3://bucket/scans/a.nii.gz', 's3://bucket/scans/b.nii.gz', 's3://bucket/other/c.nii.gz']
+    )
+
+    assert missing == {'s3://bucket/scans/b.nii.gz', 's3://bucket/other/c.nii.gz'}
+    client.get_paginator.return_value.paginate.assert_called_once_with(
+        Bucket='bucket', Prefix='scans/', Delimiter='/'
+    )
+    client.head_object.assert_called_once_with(Bucket='bucket', Key='other/c.nii.gz')
+
+
 @pytest.mark.django_db
 def test_import_with_relative_path(project_factory):
     rel_import_csv = Path(__file__).parent / 'data' / 'relative_import.csv'
@@ -271,3 +391,500 @@ def test_import_export_unchanged(
 
     else:
         assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_reimport_reuses_unchanged_evaluations(mocker, project_factory):
+    rel_import_csv = Path(__file__).parent / 'data' / 'relative_import.csv'
+    project = project_factory(name='Guys', import_path=rel_import_csv)
+    evaluate_frames = mocker.patch('miqa.core.tasks._evaluate_frames')
+    import_data(project.id)
+    assert evaluate_frames.call_count == 1
+
+    frame = Frame.objects.get()
+    model_name = project.evaluation_models['DTI']
+    Evaluation.objects.create(
+        frame=frame,
+        evaluation_model=model_name,
+        results={'overall_quality': 0.5},
+        fingerprint=_frame_fingerprint(frame, model_name),
+    )
+
+    import_data(project.id)
+
+    assert evaluate_frames.call_count == 1
+    frame = Frame.objects.get()
+    assert frame.frame_evaluation.results == {'overall_quality': 0.5}
+
+    # a different evaluation model invalidates the previous result
+    project.evaluation_models = {**project.evaluation_models, 'DTI': 'MIQAMix-0'}
+    project.save()
+    import_data(project.id)
+
+    assert evaluate_frames.call_count == 2
+    assert not Evaluation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_incremental_import(tmp_path, mocker, user, project_factory):
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    csv_file = tmp_path / 'import.csv'
+
+    def write_import_csv(notes, frames):
+        output, _writer = generate_import_csv(
+            rows=[
+                {
+                    'project_name': 'incremental',
+                    'experiment_name': 'exp',
+                    'scan_name': scan_name,
+                    'scan_type': scan_type,
+                    'frame_number': frame_number,
+                    'file_location': example,
+                    'experiment_notes': notes,
+                }
+                for scan_name, scan_type, frame_number in frames
+            ]
+        )
+        csv_file.write_text(output.getvalue())
+
+    mocker.patch('miqa.core.tasks._evaluate_frames')
+    project = project_factory(name='incremental', import_path=str(csv_file))
+    write_import_csv('old notes', [('kept', 'T1', 0), ('removed', 'T1', 0)])
+    import_data(project.id)
+    kept = Scan.objects.get(name='kept')
+    ScanDecision.objects.create(scan=kept, creator=user, decision='U')
+
+    write_import_csv('new notes', [('kept', 'T1', 0), ('kept', 'T1', 1), ('added', 'T2', 0)])
+    diff, errors = import_data_incremental(project.id, dry_run=True)
+
+    assert errors == []
+    assert diff['experiments'] == {'created': [], 'updated': ['incremental/exp'], 'deleted': []}
+    assert diff['scans'] == {
+        'created': ['incremental/exp/added'],
+        'updated': [],
+        'deleted': ['incremental/exp/removed'],
+    }
+    assert diff['frames'] == {
+        'created': ['incremental/exp/added/0', 'incremental/exp/kept/1'],
+        'updated': [],
+        'deleted': ['incremental/exp/removed/0'],
+    }
+    assert sorted(Scan.objects.values_list('name', flat=True)) == ['kept', 'removed']
+
+    assert import_data_incremental(project.id) == (diff, [])
+
+    assert sorted(Scan.objects.values_list('name', flat=True)) == ['added', 'kept']
+    kept.refresh_from_db()
+    assert kept.experiment.note == 'new notes'
+    assert kept.frames.count() == 2
+    assert kept.decisions.count() == 1
+    assert kept.latest_decision_code == 'U'
+
+    # importing the same file again changes nothing
+    diff, _ = import_data_incremental(project.id)
+    assert not any(changes for kind in diff.values() for changes in kind.values())
+
+
+@pytest.mark.django_db
+def test_incremental_import_undated_decision(tmp_path, mocker, settings, user, project_factory):
+    settings.REPLACE_NULL_CREATION_DATETIMES = True
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    csv_file = tmp_path / 'import.csv'
+    output, _writer = generate_import_csv(
+        rows=[
+            {
+                'project_name': 'undated',
+                'experiment_name': 'exp',
+                'scan_name': 'scan',
+                'scan_type': 'T1',
+                'frame_number': 0,
+                'file_location': example,
+                'last_decision': 'U',
+                'last_decision_creator': user.email,
+                'last_decision_note': 'note',
+            }
+        ],
+        columns=IMPORT_CSV_COLUMNS,
+    )
+    csv_file.write_text(output.getvalue())
+    mocker.patch('miqa.core.tasks._evaluate_frames')
+    project = project_factory(name='undated', import_path=str(csv_file))
+
+    import_data_incremental(project.id)
+    decision = ScanDecision.objects.get()
+    # the decision is stamped with a later import time than the stored copy
+    decision.created = decision.created.replace(year=2000)
+    decision.save(update_fields=['created'])
+    diff, _ = import_data_incremental(project.id)
+
+    assert diff['decisions'] == {'created': []}
+    assert ScanDecision.objects.count() == 1
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        '2022-01-02 03:04',
+        '2022-01-02 03:04:05',
+        '2022-01-02T03:04:05+00:00',
+        'January 2, 2022 3:04',
+    ],
+)
+def test_parse_datetime(value):
+    assert _parse_datetime(value).strftime('%Y-%m-%d %H:%M') == '2022-01-02 03:04'
+
+
+@pytest.mark.django_db
+def test_scan_decision_builder_queries(django_assert_num_queries, user, user_factory, scan):
+    other_user = user_factory()
+    decisions = [
+        {
+            'decision': 'U',
+            'creator': creator.email,
+            'note': None,
+            'created': '2022-01-02 03:04:05',
+            'user_identified_artifacts': None,
+            'location': 'i=1;j=2;k=3',
+        }
+        for creator in [user, other_user, user]
+    ]
+    import_dict = {
+        'projects': {
+            'project': {
+                'experiments': {
+                    'experiment': {
+                        'scans': {
+                            'scan': {'type': 'T1', 'frames': {}, 'decisions': decisions},
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    with django_assert_num_queries(1):
+        builder = _ScanDecisionBuilder(import_dict)
+    with django_assert_num_queries(0):
+        built = [builder.build(decision_data, scan) for decision_data in decisions]
+
+    assert [decision.creator for decision in built] == [user, other_user, user]
+    assert {decision.created for decision in built} == {'2022-01-02 03:04'}
+    assert built[0].location == {'i': '1', 'j': '2', 'k': '3'}
+
+
+@pytest.mark.django_db
+def test_import_csv_in_chunks(tmp_path, mocker, settings, user, project_factory):
+    settings.IMPORT_CHUNK_SIZE = 2
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    other = Path(__file__).parent / 'data' / 'relative_import.csv'
+    csv_file = tmp_path / 'import.csv'
+    a = {'scan_name': 'a', 'scan_type': 'T1', 'subject_id': '01'}
+    b = {'scan_name': 'b', 'scan_type': 'T2', 'subject_id': '02'}
+    c = {'scan_name': 'c', 'scan_type': 'T1', 'subject_id': '03'}
+    rows = [
+        {**a, 'frame_number': 0, 'file_location': example, 'experiment_notes': 'first notes'},
+        {**b, 'frame_number': 0, 'file_location': example, 'experiment_notes': 'other notes'},
+        {**a, 'frame_number': 1, 'file_location': example},
+        {**b, 'frame_number': 0, 'file_location': other},
+        {**c, 'frame_number': 0},
+    ]
+    output, _writer = generate_import_csv(
+        rows=[{'project_name': 'chunked', 'experiment_name': 'exp', **row} for row in rows]
+    )
+    csv_file.write_text(output.getvalue())
+    project = project_factory(name='chunked', import_path=str(csv_file))
+    evaluate_frames = mocker.patch('miqa.core.tasks._evaluate_frames')
+
+    assert import_data(project.id) == []
+
+    experiment = Experiment.objects.get()
+    assert experiment.note == 'first notes'
+    assert sorted(Scan.objects.values_list('name', 'subject_id')) == [('a', '01'), ('b', '02')]
+    assert sorted(Frame.objects.values_list('scan__name', 'frame_number', 'raw_path')) == [
+        ('a', 0, str(example)),
+        ('a', 1, str(example)),
+        ('b', 0, str(other)),
+    ]
+    evaluated = [frame.id for call in evaluate_frames.call_args_list for frame in call.args[1]]
+    assert sorted(evaluated) == sorted(Frame.objects.values_list('id', flat=True))
+    assert project.get_status()['total_scans'] == 2
+
+
+@pytest.mark.django_db
+def test_import_job_progress(tmp_path, mocker, settings, api_client, user, project_factory):
+    settings.IMPORT_CHUNK_SIZE = 2
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    csv_file = tmp_path / 'import.csv'
+    locations = {f'scan{i}': example for i in range(4)}
+    locations['missing'] = tmp_path / 'missing.nii.gz'
+    output, _writer = generate_import_csv(
+        rows=[
+            {
+                'project_name': 'jobs',
+                'experiment_name': 'exp',
+                'scan_name': scan_name,
+                'scan_type': 'T1',
+                'frame_number': 0,
+                'file_location': location,
+            }
+            for scan_name, location in locations.items()
+        ]
+    )
+    csv_file.write_text(output.getvalue())
+    project = project_factory(name='jobs', import_path=str(csv_file))
+    assign_perm('collaborator', user, project)
+    api_client.force_authenticate(user=user)
+    mocker.patch('miqa.core.tasks._evaluate_frames')
+
+    resp = api_client.post(f'/api/v1/projects/{project.id}/import')
+    assert resp.status_code == 202
+    assert resp.data['kind'] == 'import'
+
+    resp = api_client.get(f'/api/v1/jobs/{resp.data["id"]}')
+    assert resp.status_code == 200
+    assert resp.data['state'] == 'succeeded'
+    assert resp.data['finished']
+    assert resp.data['processed'] == resp.data['total'] == csv_file.stat().st_size
+    assert resp.data['errors'] == []
+    # missing files are reported, but do not fail the import
+    assert resp.data['warnings'] == [f'File not found: {tmp_path / "missing.nii.gz"}']
+    assert Scan.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_job_progress_rate_limited(django_assert_num_queries, project):
+    job = ImportExportJob.objects.create(kind=ImportExportJob.Kind.IMPORT, project=project)
+
+    with django_assert_num_queries(2):
+        for processed in range(100):
+            job.report_progress(processed, 100)
+        # finishing is always recorded
+        job.report_progress(100, 100)
+
+    job.refresh_from_db()
+    assert job.processed == job.total == 100
+
+
+@pytest.mark.django_db
+def test_import_job_failed(tmp_path, api_client, user, project_factory):
+    import_path = str(tmp_path / 'missing.csv')
+    project = project_factory(import_path=import_path)
+    assign_perm('collaborator', user, project)
+    api_client.force_authenticate(user=user)
+
+    resp = api_client.post(f'/api/v1/projects/{project.id}/import')
+
+    assert resp.status_code == 202
+    assert resp.data['state'] == 'failed'
+    assert resp.data['errors'] == [f'Could not locate import file at {import_path}.']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('extension', ['csv', 'json'])
+def test_import_job_error_after_reading(tmp_path, mocker, project_factory, extension):
+    import_file = tmp_path / f'import.{extension}'
+    if extension == 'csv':
+        import_file.write_text(generate_import_csv()[0].getvalue())
+    else:
+        import_file.write_text(json.dumps({'projects': {}}))
+    project = project_factory(import_path=str(import_file))
+    job = ImportExportJob.objects.create(kind=ImportExportJob.Kind.IMPORT, project=project)
+    # e.g. a frame directory which cannot be listed, rather than the import file itself
+    mocker.patch(
+        'miqa.core.tasks.validate_import_dict', side_effect=PermissionError('Permission denied')
+    )
+
+    run_import_job(str(job.id))
+
+    job.refresh_from_db()
+    assert job.state == ImportExportJob.State.FAILED
+    assert job.errors == ['Unexpected error: Permission denied']
+
+
+@pytest.mark.django_db
+def test_job_hidden_from_other_users(api_client, user, user_factory, project):
+    job = ImportExportJob.objects.create(
+        kind=ImportExportJob.Kind.EXPORT, project=project, creator=user_factory()
+    )
+    api_client.force_authenticate(user=user)
+
+    assert api_client.get(f'/api/v1/jobs/{job.id}').status_code == 404
+
+    assign_perm('collaborator', user, project)
+    assert api_client.get(f'/api/v1/jobs/{job.id}').status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', [1, 4])
+def test_export_query_count(
+    tmp_path,
+    django_assert_num_queries,
+    project_factory,
+    experiment_factory,
+    scan_factory,
+    frame_factory,
+    scan_decision_factory,
+    size,
+):
+    project = project_factory(export_path=str(tmp_path / 'export.json'))
+    for experiment_index in range(size):
+        experiment = experiment_factory(project=project, name=f'experiment{experiment_index}')
+        for scan_index in range(size):
+            scan = scan_factory(experiment=experiment, name=f'scan{scan_index}', scan_type='T1')
+            for frame_number in range(size):
+                frame_factory(scan=scan, frame_number=frame_number)
+                scan_decision_factory(scan=scan, decision='U')
+
+    # the project, its experiments, scans, frames and decisions with their creators
+    with django_assert_num_queries(5):
+        perform_export(project.id)
+
+    with open(tmp_path / 'export.json') as fd:
+        exported = json.load(fd)['projects'][project.name]
+    assert len(exported['experiments']) == size
+    for experiment in exported['experiments'].values():
+        assert len(experiment['scans']) == size
+        for scan in experiment['scans'].values():
+            assert len(scan['frames']) == size
+            assert len(scan['decisions']) == size
+            assert all(decision['creator'] for decision in scan['decisions'])
+
+    project.export_path = str(tmp_path / 'export.csv')
+    project.save()
+    # a CSV export only has the latest decisions, which are joined to the scans
+    with django_assert_num_queries(4):
+        perform_export(project.id)
+    exported_csv = pandas.read_csv(tmp_path / 'export.csv')
+    assert len(exported_csv) == size**3
+    assert set(exported_csv['last_decision']) == {'U'}
+
+
+@pytest.mark.django_db
+def test_download_export(
+    settings,
+    api_client,
+    user,
+    project,
+    experiment_factory,
+    scan_factory,
+    frame_factory,
+    scan_decision_factory,
+):
+    settings.EXPORT_CHUNK_SIZE = 2
+    for experiment_index in range(3):
+        experiment = experiment_factory(project=project, name=f'experiment{experiment_index}')
+        scan = scan_factory(experiment=experiment, name='scan', scan_type='T1')
+        frame_factory(scan=scan, frame_number=0)
+        frame_factory(scan=scan, frame_number=1)
+        scan_decision_factory(scan=scan, decision='U')
+    assign_perm('collaborator', user, project)
+    api_client.force_authenticate(user=user)
+
+    resp = api_client.get(f'/api/v1/projects/{project.id}/download', {'file_format': 'json'})
+    assert resp.status_code == 200
+    assert resp['Content-Disposition'] == f'attachment; filename="{project.name}.json"'
+    exported = json.loads(b''.join(resp.streaming_content))
+    experiments = exported['projects'][project.name]['experiments']
+    assert list(experiments.keys()) == ['experiment0', 'experiment1', 'experiment2']
+
+    resp = api_client.get(f'/api/v1/projects/{project.id}/download')
+    assert resp.status_code == 200
+    assert resp['Content-Type'] == 'text/csv'
+    expected_csv = import_dict_to_dataframe(exported).to_csv(index=False)
+    assert b''.join(resp.streaming_content).decode() == expected_csv
+
+
+@pytest.mark.django_db
+def test_import_gzip_csv(tmp_path, mocker, project_factory):
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    output, _writer = generate_import_csv(
+        rows=[
+            {
+                'project_name': 'gzipped',
+                'experiment_name': 'exp',
+                'scan_name': f'scan{i}',
+                'scan_type': 'T1',
+                'frame_number': 0,
+                'file_location': example,
+            }
+            for i in range(3)
+        ]
+    )
+    csv_file = tmp_path / 'import.csv.gz'
+    with gzip.open(csv_file, 'wt') as fd:
+        fd.write(output.getvalue())
+    project = project_factory(name='gzipped', import_path=str(csv_file))
+    mocker.patch('miqa.core.tasks._evaluate_frames')
+
+    assert import_data(project.id) == []
+
+    assert sorted(Scan.objects.values_list('name', flat=True)) == ['scan0', 'scan1', 'scan2']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('extension', ['gz', 'zst'])
+def test_import_corrupt_compressed_csv(tmp_path, project_factory, extension):
+    if extension == 'zst':
+        pytest.importorskip('zstandard')
+    csv_file = tmp_path / f'import.csv.{extension}'
+    # a truncated gzip file, which is not a zstd file either
+    csv_file.write_bytes(gzip.compress(','.join(IMPORT_CSV_COLUMNS).encode())[:-8])
+    project = project_factory(name='corrupt', import_path=str(csv_file))
+
+    with pytest.raises(APIException, match=f'Could not decompress import file {csv_file}'):
+        import_data(project.id)
+
+
+@pytest.mark.django_db
+def test_import_gzip_csv_error_after_decompressing(tmp_path, mocker, project_factory):
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    output, _writer = generate_import_csv(
+        rows=[
+            {
+                'project_name': 'gzipped',
+                'experiment_name': 'exp',
+                'scan_name': 'scan',
+                'scan_type': 'T1',
+                'frame_number': 0,
+                'file_location': example,
+            }
+        ]
+    )
+    csv_file = tmp_path / 'import.csv.gz'
+    with gzip.open(csv_file, 'wt') as fd:
+        fd.write(output.getvalue())
+    project = project_factory(name='gzipped', import_path=str(csv_file))
+    job = ImportExportJob.objects.create(kind=ImportExportJob.Kind.IMPORT, project=project)
+    mocker.patch('miqa.core.tasks._create_import_objects', side_effect=EOFError('not the file'))
+
+    run_import_job(str(job.id))
+
+    job.refresh_from_db()
+    assert job.state == ImportExportJob.State.FAILED
+    # the error is not mistaken for a corrupt import file
+    assert job.errors == ['Unexpected error: not the file']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('extension', ['csv', 'json'])
+def test_export_gzip(tmp_path, project_factory, frame_factory, extension):
+    project = project_factory(export_path=str(tmp_path / f'export.{extension}'))
+    frame_factory(scan__experiment__project=project, scan__name='scan', frame_number=0)
+    perform_export(project.id)
+    project.export_path = str(tmp_path / f'export.{extension}.gz')
+    project.save()
+
+    perform_export(project.id)
+
+    with gzip.open(tmp_path / f'export.{extension}.gz', 'rt') as fd:
+        assert fd.read() == (tmp_path / f'export.{extension}').read_text()
+
+
+def test_open_text_zstd(tmp_path):
+    pytest.importorskip('zstandard')
+    path = tmp_path / 'export.json.zst'
+
+    with open(path, 'wb') as raw, open_text(raw, str(path), 'w') as fd:
+        fd.write('{"projects": {}}')
+    with open(path, 'rb') as raw, open_text(raw, str(path)) as fd:
+        assert json.load(fd) == {'projects': {}}
@@ -0,0 +1,270 @@
+import json
+from pathlib import Path
+import random
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pandas
+import pytest
+from schema import Optional, Or, Schema, Use
+
+from miqa.core.conversion.import_export_csvs import (
+    IMPORT_CSV_COLUMNS,
+    import_dataframe_to_dict,
+    validate_import_dict,
+)
+from miqa.core.models import Frame
+from miqa.core.tasks import import_data
+
+FRAMES_PER_SCAN = 2
+SCANS_PER_EXPERIMENT = 10
+
+
+def write_synthetic_csv(csv_file: Path, project_name: str, rows: int):
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    lines = [','.join(IMPORT_CSV_COLUMNS[:6])]
+    for row in range(rows):
+        scan = row // FRAMES_PER_SCAN
+        experiment = scan // SCANS_PER_EXPERIMENT
+        lines.append(
+            f'{project_name},experiment{experiment},scan{scan},T1,'
+            f'{row % FRAMES_PER_SCAN},{example}'
+        )
+    csv_file.write_text('\n'.join(lines))
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('rows', [10_000, 50_000, 100_000])
+def test_import_benchmark(tmp_path, mocker, record_property, project_factory, rows):
+    csv_file = tmp_path / 'import.csv'
+    project = project_factory(name='benchmark', import_path=str(csv_file))
+    write_synthetic_csv(csv_file, project.name, rows)
+    # only measure the import itself
+    mocker.patch('miqa.core.tasks.evaluate_data')
+
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        import_data(project.id)
+    elapsed = time.perf_counter() - start
+
+    record_property('rows', rows)
+    record_property('wall_clock_seconds', elapsed)
+    record_property('queries', len(queries))
+    assert Frame.objects.count() == rows
+
+
+def reference_import_dataframe_to_dict(df):
+    """The original groupby/iterrows implementation of import_dataframe_to_dict."""
+    ingest_dict = {'projects': {}}
+    for project_name, project_df in df.groupby('project_name'):
+        project_dict = {'experiments': {}}
+        if list(project_df['experiment_name'].unique()) != ['']:
+            for experiment_name, experiment_df in project_df.groupby('experiment_name'):
+                experiment_dict = {'scans': {}}
+                if 'experiment_notes' in experiment_df.columns:
+                    experiment_dict['notes'] = experiment_df['experiment_notes'].iloc[0]
+                for scan_name, scan_df in experiment_df.groupby('scan_name'):
+                    scan_dict = {}
+                    if list(scan_df['file_location'].unique()) != ['']:
+                        scan_dict = {
+                            'type': scan_df['scan_type'].iloc[0],
+                            'frames': {
+                                int(row[1]['frame_number']): {
+                                    'file_location': row[1]['file_location']
+                                }
+                                for row in scan_df.iterrows()
+                            },
+                            'decisions': [],
+                        }
+                        if 'subject_id' in scan_df.columns:
+                            scan_dict['subject_id'] = scan_df['subject_id'].iloc[0]
+                        if 'session_id' in scan_df.columns:
+                            scan_dict['session_id'] = scan_df['session_id'].iloc[0]
+                        if 'scan_link' in scan_df.columns:
+                            scan_dict['scan_link'] = scan_df['scan_link'].iloc[0]
+                        if 'last_decision' in scan_df.columns and scan_df['last_decision'].iloc[0]:
+                            decision_dict = {
+                                'decision': scan_df['last_decision'].iloc[0],
+                                'creator': scan_df['last_decision_creator'].iloc[0],
+                                'note': scan_df['last_decision_note'].iloc[0],
+                                'created': str(scan_df['last_decision_created'].iloc[0])
+                                if scan_df['last_decision_created'].iloc[0]
+                                else None,
+                                'user_identified_artifacts': scan_df['identified_artifacts'].iloc[0]
+                                or None,
+                                'location': scan_df['location_of_interest'].iloc[0] or None,
+                            }
+                            decision_dict = {k: (v or None) for k, v in decision_dict.items()}
+                            scan_dict['decisions'].append(decision_dict)
+                        experiment_dict['scans'][scan_name] = scan_dict
+                project_dict['experiments'][experiment_name] = experiment_dict
+        ingest_dict['projects'][project_name] = project_dict
+    return ingest_dict
+
+
+def synthetic_dataframe(rows: int, seed: int = 0):
+    """Build an import dataframe with all columns, in shuffled row order."""
+    rng = random.Random(seed)
+    data = []
+    for row in range(rows):
+        scan = row // FRAMES_PER_SCAN
+        experiment = scan // SCANS_PER_EXPERIMENT
+        decided = scan % 3 == 0
+        data.append(
+            [
+                f'project{experiment % 2}',
+                f'experiment{experiment}' if row % 500 else '',
+                f'scan{scan}',
+                'T1',
+                str(row % FRAMES_PER_SCAN),
+                f'/data/{row}.nii.gz' if scan % 7 else '',
+                f'notes {experiment}',
+                f'subject{scan}',
+                f'session{scan}',
+                '',
+                'U' if decided else '',
+                'reviewer@example.com' if decided else '',
+                'looks fine' if decided else '',
+                '2022-01-02 03:04:05' if decided else '',
+                'lesions;misalignment' if decided else '',
+                'i=1;j=2;k=3' if decided else '',
+            ]
+        )
+    rng.shuffle(data)
+    return pandas.DataFrame(data, columns=IMPORT_CSV_COLUMNS).astype(str)
+
+
+@pytest.mark.parametrize(
+    'sample',
+    [
+        'scans_to_review.csv',
+        'scans_to_review_optional_columns.csv',
+        'demo_project.csv',
+        None,
+    ],
+)
+def test_import_dataframe_to_dict_matches_reference(samples_dir, sample):
+    if sample is None:
+        df = synthetic_dataframe(2_000)
+    else:
+        df = pandas.read_csv(samples_dir / sample, index_col=False, na_filter=False).astype(str)
+
+    converted = import_dataframe_to_dict(df, None)
+    reference = reference_import_dataframe_to_dict(df)
+
+    assert converted == reference
+    # the order of the keys must match as well
+    assert json.dumps(converted) == json.dumps(reference)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('rows', [10_000, 50_000, 100_000])
+def test_import_dataframe_to_dict_benchmark(record_property, rows):
+    df = synthetic_dataframe(rows)
+
+    start = time.perf_counter()
+    reference_import_dataframe_to_dict(df)
+    reference_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    import_dataframe_to_dict(df, None)
+    elapsed = time.perf_counter() - start
+
+    record_property('rows', rows)
+    record_property('reference_seconds', reference_elapsed)
+    record_property('wall_clock_seconds', elapsed)
+
+
+def reference_validate_import_dict(import_dict, import_path):
+    """The original schema-based validation, followed by a second pass over file locations."""
+    decision = {
+        'decision': Use(str),
+        'creator': Or(str, None),
+        'note': Or(str, None),
+        'created': Or(str, None),
+        'user_identified_artifacts': Or(str, None),
+        'location': Or(str, None),
+    }
+    Schema(
+        {
+            'projects': {
+                Optional(Use(str)): {
+                    'experiments': {
+                        Optional(Use(str)): {
+                            Optional('notes'): Optional(str, None),
+                            'scans': {
+                                Optional(Use(str)): {
+                                    'type': Use(str),
+                                    Optional('subject_id'): Or(str, None),
+                                    Optional('session_id'): Or(str, None),
+                                    Optional('scan_link'): Or(str, None),
+                                    'frames': {Use(int): {'file_location': Use(str)}},
+                                    Optional('decisions'): [decision],
+                                    Optional('last_decision'): Or(decision, None),
+                                }
+                            },
+                        }
+                    }
+                }
+            }
+        }
+    ).validate(import_dict)
+
+    not_found_errors = []
+
+    def validate_file_locations(input_dict):
+        if not isinstance(input_dict, dict):
+            return
+        for key, value in input_dict.items():
+            if key == 'file_location':
+                raw_path = Path(value.strip())
+                if not value.startswith('s3://'):
+                    if not raw_path.is_absolute():
+                        raw_path = Path(import_path).parent.parent / raw_path
+                    if not raw_path.exists():
+                        not_found_errors.append(f'File not found: {raw_path}')
+                input_dict[key] = str(raw_path) if value and 's3://' not in value else value
+            else:
+                validate_file_locations(value)
+
+    validate_file_locations(import_dict)
+    return import_dict, not_found_errors
+
+
+@pytest.mark.django_db
+def test_validate_import_dict_matches_reference(project_factory):
+    df = synthetic_dataframe(2_000)
+    project = project_factory(import_path=str(Path(__file__).parent / 'data' / 'import.csv'))
+
+    reference, reference_errors = reference_validate_import_dict(
+        import_dataframe_to_dict(df, None), project.import_path
+    )
+    validated, errors = validate_import_dict(import_dataframe_to_dict(df, None), project)
+
+    assert errors == reference_errors
+    # frame numbers are now normalized to integers, which serialize the same way
+    assert json.dumps(validated) == json.dumps(reference)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('rows', [10_000, 50_000, 100_000])
+def test_validate_import_dict_benchmark(record_property, project_factory, rows):
+    df = synthetic_dataframe(rows)
+    df['file_location'] = df['file_location'].str.replace('/data/', 's3://bucket/')
+    project = project_factory(import_path='/import.csv')
+
+    import_dict = import_dataframe_to_dict(df, None)
+    start = time.perf_counter()
+    reference_validate_import_dict(import_dict, project.import_path)
+    reference_elapsed = time.perf_counter() - start
+
+    import_dict = import_dataframe_to_dict(df, None)
+    start = time.perf_counter()
+    validate_import_dict(import_dict, project)
+    elapsed = time.perf_counter() - start
+
+    record_property('rows', rows)
+    record_property('reference_seconds', reference_elapsed)
+    record_property('wall_clock_seconds', elapsed)
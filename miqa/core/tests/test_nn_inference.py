@@ -0,0 +1,62 @@
+from pathlib import Path
+import shutil
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+import torchio  # noqa: E402
+
+from miqa.learning.evaluation_models import available_evaluation_models  # noqa: E402
+from miqa.learning.nn_inference import (  # noqa: E402
+    TiledClassifier,
+    evaluate1,
+    evaluate_many,
+    get_model,
+)
+
+
+@pytest.mark.parametrize('tile_batch_size', [2, 5, 100])
+def test_tiled_classifier_tile_batch_size(tile_batch_size):
+    torch.manual_seed(0)
+    model = TiledClassifier(
+        in_shape=(1, 8, 8, 8),
+        classes=3,
+        channels=(2, 4),
+        strides=(2, 2),
+        tile_batch_size=1,
+    )
+    model.eval()
+    # two images with axes both larger and smaller than a tile, so tiles overlap and pad
+    inputs = torch.rand(2, 1, 13, 10, 6)
+
+    with torch.no_grad():
+        expected = model(inputs)
+        model.tile_batch_size = tile_batch_size
+        actual = model(inputs)
+
+    assert actual.shape == (2, 3)
+    assert torch.allclose(actual, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 4])
+def test_evaluate_many_matches_evaluate1(tmp_path, batch_size):
+    example = Path(__file__).parent / 'data' / 'example.nii.gz'
+    image_paths = []
+    for index in range(3):
+        image_path = tmp_path / f'full{index}.nii.gz'
+        shutil.copy(example, image_path)
+        image_paths.append(str(image_path))
+    # differently shaped images are batched separately
+    for index in range(2):
+        image_path = tmp_path / f'cropped{index}.nii.gz'
+        crop = torchio.transforms.Crop((0, index + 1, 0, 0, 0, 0))
+        crop(torchio.ScalarImage(example)).save(image_path)
+        image_paths.append(str(image_path))
+    model = get_model(available_evaluation_models['MIQAT1-0'].path)
+
+    results = evaluate_many(model, image_paths, batch_size=batch_size)
+
+    assert list(results) == image_paths
+    for image_path in image_paths:
+        assert results[image_path] == pytest.approx(evaluate1(model, image_path), abs=1e-5)
@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from guardian.shortcuts import assign_perm
+import pytest
+
+from miqa.core.models import Evaluation
+
+
+@pytest.fixture
+def populate_project(
+    project, user, experiment_factory, scan_factory, frame_factory, scan_decision_factory
+):
+    """Add `size` locked experiments to the project, each with `size` reviewed scans and frames."""
+
+    def _populate(size: int):
+        for _ in range(size):
+            experiment = experiment_factory(project=project, lock_owner=user)
+            for _ in range(size):
+                scan = scan_factory(experiment=experiment)
+                scan_decision_factory(scan=scan, creator=user)
+                for frame_number in range(size):
+                    frame = frame_factory(scan=scan, frame_number=frame_number)
+                    Evaluation.objects.create(frame=frame, evaluation_model='test', results={})
+        return experiment, scan
+
+    return _populate
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    [
+        '/api/v1/projects',
+        '/api/v1/projects/{project.id}',
+        '/api/v1/projects/{project.id}?summary=true',
+        '/api/v1/projects/{project.id}/task_overview',
+        '/api/v1/experiments',
+        '/api/v1/experiments/{experiment.id}',
+        '/api/v1/scans',
+        '/api/v1/scans?experiment={experiment.id}',
+        '/api/v1/scans/{scan.id}',
+        '/api/v1/frames',
+        '/api/v1/scan-decisions',
+    ],
+)
+def test_query_count_constant(api_client, user, project, populate_project, url):
+    assign_perm('tier_2_reviewer', user, project)
+    api_client.force_authenticate(user=user)
+
+    def count_queries(experiment, scan) -> int:
+        formatted_url = url.format(project=project, experiment=experiment, scan=scan)
+        # the first request caches e.g. the permissions of the user
+        assert api_client.get(formatted_url).status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get(formatted_url).status_code == 200
+        return len(queries)
+
+    small = count_queries(*populate_project(1))
+    large = count_queries(*populate_project(3))
+
+    assert small == large
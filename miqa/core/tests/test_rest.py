@@ -1,15 +1,19 @@
+import datetime
 import json
 from uuid import UUID
 
-from guardian.shortcuts import assign_perm, get_perms
+from django.core.management import call_command
+from guardian.shortcuts import assign_perm, get_perms, remove_perm
 import pytest
 
+from miqa.core.models import ReviewProgress, Scan, ScanDecision
 from miqa.core.rest.frame import FrameSerializer
 from miqa.core.rest.permissions import has_read_perm, has_review_perm
 from miqa.core.rest.project import ProjectSerializer
 from miqa.core.rest.scan import ScanSerializer
 from miqa.core.rest.scan_decision import ScanDecisionSerializer
 from miqa.core.rest.user import UserSerializer
+from miqa.core.s3 import _presigned_url_cache
 
 
 # to avoid failing a comparison between a string id and UUID
@@ -89,6 +93,62 @@ def test_project_status(
     assert status['total_complete'] == 3
 
 
+@pytest.mark.django_db
+def test_review_progress(
+    django_assert_num_queries,
+    project,
+    experiment_factory,
+    scan_factory,
+    scan_decision_factory,
+    user,
+):
+    assign_perm('tier_1_reviewer', user, project)
+    reviewed_experiment = experiment_factory(project=project)
+    unreviewed_experiment = experiment_factory(project=project)
+    scan_factory(experiment=unreviewed_experiment)
+    scan_decision_factory(
+        scan=scan_factory(experiment=reviewed_experiment), creator=user, decision='UN'
+    )
+    scan_decision_factory(scan=scan_factory(experiment=reviewed_experiment), decision='U')
+
+    with django_assert_num_queries(1):
+        status = project.get_status()
+    assert status == {
+        'total_scans': 3,
+        'total_complete': 1,
+        'needs_tier_2_review': 1,
+        'unreviewed': 1,
+    }
+    progress = ReviewProgress.objects.get(experiment=reviewed_experiment)
+    assert (progress.total_scans, progress.complete, progress.needs_tier_2_review) == (2, 1, 1)
+
+    # decisions of tier 2 reviewers complete their scans
+    project.update_group('tier_2_reviewer', [user.username])
+    assert project.get_status()['total_complete'] == 2
+
+    # counters which went stale, e.g. through bulk edits, are fixed by a rebuild
+    ScanDecision.objects.update(decision='Q?')
+    remove_perm('tier_2_reviewer', user, project)
+    call_command('rebuild_review_progress')
+    assert project.get_status()['total_complete'] == 0
+
+
+@pytest.mark.django_db
+def test_latest_decision(scan, scan_decision_factory):
+    latest = scan_decision_factory(scan=scan, decision='UN')
+    # decisions imported with an older creation time do not replace the latest one
+    scan_decision_factory(
+        scan=scan, decision='U', created=latest.created - datetime.timedelta(days=1)
+    )
+    scan.refresh_from_db()
+    assert (scan.latest_decision, scan.latest_decision_code) == (latest, 'UN')
+
+    latest.delete()
+    Scan.update_latest_decisions(Scan.objects.all())
+    scan.refresh_from_db()
+    assert scan.latest_decision_code == 'U'
+
+
 @pytest.mark.django_db
 def test_project_settings_get(user_api_client, project, user):
     resp = user_api_client().get(f'/api/v1/projects/{project.id}/settings')
@@ -234,6 +294,76 @@ def test_scans_list(user_api_client, scan, user):
         }
 
 
+@pytest.mark.django_db
+def test_project_summary(api_client, user, project, experiment_factory, scan_factory):
+    experiment = experiment_factory(project=project)
+    scan_factory(experiment=experiment)
+    assign_perm('collaborator', user, project)
+    api_client.force_authenticate(user=user)
+
+    resp = api_client.get(f'/api/v1/projects/{project.id}', {'summary': True})
+    assert resp.status_code == 200
+    assert resp.data['status']['total_scans'] == 1
+    assert [dict(experiment_data) for experiment_data in resp.data['experiments']] == [
+        {
+            'id': experiment.id,
+            'name': experiment.name,
+            'lock_owner': None,
+            'project': project.id,
+            'note': experiment.note,
+            'status': {
+                'total_scans': 1,
+                'total_complete': 0,
+                'needs_tier_2_review': 0,
+                'unreviewed': 1,
+            },
+        }
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', [1, 4])
+def test_scans_list_fields(
+    django_assert_num_queries,
+    api_client,
+    user,
+    project,
+    experiment_factory,
+    scan_factory,
+    frame_factory,
+    scan_decision_factory,
+    size,
+):
+    experiment = experiment_factory(project=project)
+    for _ in range(size):
+        scan = scan_factory(experiment=experiment)
+        frame_factory(scan=scan)
+        scan_decision_factory(scan=scan)
+    scan_factory(experiment=experiment_factory(project=project))
+    assign_perm('collaborator', user, project)
+    api_client.force_authenticate(user=user)
+
+    # the first request also caches the permissions of the user
+    api_client.get('/api/v1/scans', {'experiment': experiment.id})
+    # the experiment, the count and page of scans, and their frames and decisions
+    with django_assert_num_queries(5):
+        resp = api_client.get('/api/v1/scans', {'experiment': experiment.id})
+    assert resp.data['count'] == size
+    assert all(len(scan_data['decisions']) == 1 for scan_data in resp.data['results'])
+
+    with django_assert_num_queries(3):
+        resp = api_client.get(
+            '/api/v1/scans', {'experiment': experiment.id, 'fields': 'id,name', 'limit': 2}
+        )
+    assert resp.data['count'] == size
+    assert [set(scan_data) for scan_data in resp.data['results']] == [{'id', 'name'}] * min(
+        size, 2
+    )
+
+    resp = api_client.get('/api/v1/scans', {'fields': 'id,size'})
+    assert resp.status_code == 400
+
+
 @pytest.mark.django_db
 def test_scan_decisions_list(user_api_client, scan_decision, user):
     resp = user_api_client(project=scan_decision.scan.experiment.project).get(
@@ -277,6 +407,26 @@ def test_frames_list(user_api_client, frame, user):
         }
 
 
+@pytest.mark.django_db
+def test_frame_download_url(mocker, settings, api_client, user, frame_factory):
+    settings.S3_SUPPORT = True
+    _presigned_url_cache.cache_clear()
+    frame = frame_factory(raw_path='s3://bucket/image.nii.gz')
+    assign_perm('collaborator', user, frame.scan.experiment.project)
+    api_client.force_authenticate(user=user)
+    client = mocker.patch('miqa.core.s3.get_s3_client').return_value
+    client.generate_presigned_url.return_value = 'https://bucket/image.nii.gz?signature'
+
+    resp = api_client.get(f'/api/v1/frames/{frame.id}/download_url')
+    assert resp.status_code == 200
+    assert resp.data == {'id': frame.id, 'download_url': 'https://bucket/image.nii.gz?signature'}
+    # the URL is presigned once, and reused until it is about to expire
+    assert api_client.get(f'/api/v1/frames/{frame.id}').data['download_url'] == resp.data[
+        'download_url'
+    ]
+    client.generate_presigned_url.assert_called_once()
+
+
 @pytest.mark.django_db
 def test_experiment_lock_acquire_requires_auth(api_client, experiment):
     resp = api_client.post(f'/api/v1/experiments/{experiment.id}/lock')
@@ -403,3 +553,6 @@ def test_create_scan_decision_with_lock(user_api_client, scan, user):
         decisions = scan.decisions.all()
         assert len(decisions) == 1
         assert decisions[0].decision == 'U'
+        scan.refresh_from_db()
+        assert scan.latest_decision == decisions[0]
+        assert (scan.latest_decision_code, scan.latest_decision_creator) == ('U', user)
@@ -0,0 +1,107 @@
+import itertools
+
+import pytest
+
+from miqa.core.s3 import (
+    PRESIGNED_URL_EXPIRY_MARGIN,
+    S3_UPLOAD_PART_SIZE,
+    PresignedUrlCache,
+    S3Upload,
+    upload_s3_file,
+)
+
+
+@pytest.fixture
+def s3_client(mocker):
+    client = mocker.Mock()
+    client.create_multipart_upload.return_value = {'UploadId': 'upload'}
+    client.upload_part.side_effect = lambda PartNumber, **kwargs: {'ETag': f'etag{PartNumber}'}
+    signatures = itertools.count()
+    client.generate_presigned_url.side_effect = lambda method, Params, ExpiresIn: (
+        f'https://{Params["Bucket"]}/{Params["Key"]}?signature={next(signatures)}'
+    )
+    return client
+
+
+def test_s3_upload_in_parts(s3_client):
+    upload = S3Upload(s3_client, 'bucket', 'export.csv', part_size=4)
+    upload.write(b'012345')
+    upload.write(b'6789')
+    upload.complete()
+
+    assert [call.kwargs['Body'] for call in s3_client.upload_part.call_args_list] == [
+        b'0123',
+        b'4567',
+        b'89',
+    ]
+    s3_client.complete_multipart_upload.assert_called_once_with(
+        Bucket='bucket',
+        Key='export.csv',
+        UploadId='upload',
+        MultipartUpload={
+            'Parts': [
+                {'ETag': 'etag1', 'PartNumber': 1},
+                {'ETag': 'etag2', 'PartNumber': 2},
+                {'ETag': 'etag3', 'PartNumber': 3},
+            ]
+        },
+    )
+    s3_client.put_object.assert_not_called()
+
+
+def test_s3_upload_small_file(s3_client):
+    upload = S3Upload(s3_client, 'bucket', 'export.csv', part_size=4)
+    upload.write(b'01')
+    upload.complete()
+
+    s3_client.put_object.assert_called_once_with(Bucket='bucket', Key='export.csv', Body=b'01')
+    s3_client.create_multipart_upload.assert_not_called()
+
+
+def test_s3_upload_aborted(mocker, s3_client):
+    mocker.patch('miqa.core.s3.get_s3_client', return_value=s3_client)
+
+    with pytest.raises(ValueError):
+        with upload_s3_file('s3://bucket/export.csv') as upload:
+            upload.write(b'0' * (S3_UPLOAD_PART_SIZE + 1))
+            raise ValueError()
+
+    s3_client.abort_multipart_upload.assert_called_once_with(
+        Bucket='bucket', Key='export.csv', UploadId='upload'
+    )
+    s3_client.complete_multipart_upload.assert_not_called()
+
+
+def test_presigned_url_cache(mocker, s3_client):
+    mocker.patch('miqa.core.s3.get_s3_client', return_value=s3_client)
+    monotonic = mocker.patch('miqa.core.s3.time.monotonic', return_value=0)
+    cache = PresignedUrlCache(expiration=3600)
+
+    url = cache.get('bucket', 'image.nii.gz')
+    assert cache.get('bucket', 'image.nii.gz') == url
+    assert cache.get('bucket', 'other.nii.gz') != url
+    s3_client.generate_presigned_url.assert_any_call(
+        'get_object', Params={'Bucket': 'bucket', 'Key': 'image.nii.gz'}, ExpiresIn=3600
+    )
+    assert s3_client.generate_presigned_url.call_count == 2
+
+    # the URL is replaced shortly before it expires
+    monotonic.return_value = 3600 - PRESIGNED_URL_EXPIRY_MARGIN - 1
+    assert cache.get('bucket', 'image.nii.gz') == url
+    monotonic.return_value = 3600 - PRESIGNED_URL_EXPIRY_MARGIN
+    assert cache.get('bucket', 'image.nii.gz') != url
+
+
+def test_presigned_url_cache_evicts_least_recently_used(mocker, s3_client):
+    mocker.patch('miqa.core.s3.get_s3_client', return_value=s3_client)
+    cache = PresignedUrlCache(expiration=3600, max_size=2)
+
+    first = cache.get('bucket', 'first')
+    cache.get('bucket', 'second')
+    cache.get('bucket', 'first')
+    cache.get('bucket', 'third')
+
+    assert cache.get('bucket', 'first') == first
+    assert s3_client.generate_presigned_url.call_count == 3
+    cache.get('bucket', 'second')
+    assert s3_client.generate_presigned_url.call_count == 4
@@ -1,11 +1,39 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import logging
 from pathlib import Path
-from typing import List
+import threading
+from typing import Any, Hashable, List, Optional
 
 from uri import URI
 
 from miqa.learning.nn_inference import get_model
 
+logger = logging.getLogger(__name__)
+
+
+PROC_MEMINFO = Path('/proc/meminfo')
+
+
+def _available_memory(meminfo: Path = PROC_MEMINFO) -> Optional[int]:
+    """
+    Return the memory available for new allocations without swapping, in bytes.
+
+    This is Linux's MemAvailable, which unlike the free memory counts reclaimable page cache, e.g.
+    of cached frames, as available.
+    """
+    try:
+        with open(meminfo) as fd:
+            for line in fd:
+                name, _, value = line.partition(':')
+                if name == 'MemAvailable':
+                    # e.g. "MemAvailable:    5468160 kB"
+                    return int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # not supported on this platform
+    return None
+
 
 class EvaluationModel(ABC):
     def __init__(self, uri: URI, expected_outputs: List[str]):
@@ -17,11 +45,90 @@ class EvaluationModel(ABC):
     def load(self):
         pass
 
+    def version(self) -> Hashable:
+        """Identify the on-disk state of this model; a changed version invalidates caches."""
+        return None
+
+    def get(self):
+        """Return a loaded instance of this model, reusing one already loaded by this process."""
+        return model_cache.get(self)
+
 
 class NNModel(EvaluationModel):
+    @property
+    def path(self) -> Path:
+        return Path(__file__).parent / 'models' / str(self.uri)
+
     def load(self):
-        path = Path(__file__).parent / 'models' / str(self.uri)
-        return get_model(str(path))
+        return get_model(str(self.path))
+
+    def version(self) -> Hashable:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+class EvaluationModelCache:
+    """
+    Per-process registry of loaded evaluation models.
+
+    Each Celery worker process loads a model the first time it is needed and then reuses it.
+    Models are evicted least-recently-used first once more than `max_size` are loaded, or when
+    the available system memory drops below `min_available_memory` bytes. A cached model is
+    reloaded when the version reported by its EvaluationModel (e.g. the modification time of the
+    weights file) changes.
+    """
+
+    def __init__(self, max_size: int = 2, min_available_memory: int = 512 * 1024 * 1024):
+        self.max_size = max_size
+        self.min_available_memory = min_available_memory
+        self._models: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, evaluation_model: EvaluationModel) -> bool:
+        return evaluation_model in self._models
+
+    def get(self, evaluation_model: EvaluationModel) -> Any:
+        version = evaluation_model.version()
+        with self._lock:
+            if evaluation_model in self._models:
+                cached_version, loaded_model = self._models[evaluation_model]
+                if cached_version == version:
+                    self._models.move_to_end(evaluation_model)
+                    return loaded_model
+                logger.info(f'Evaluation model {evaluation_model.uri} changed on disk, reloading')
+                del self._models[evaluation_model]
+
+            loaded_model = evaluation_model.load()
+            self._models[evaluation_model] = (version, loaded_model)
+            self._evict()
+            return loaded_model
+
+    def invalidate(self, evaluation_model: Optional[EvaluationModel] = None) -> None:
+        """Drop one model from the cache, or every model if none is given."""
+        with self._lock:
+            if evaluation_model is None:
+                self._models.clear()
+            else:
+                self._models.pop(evaluation_model, None)
+
+    def _low_memory(self) -> bool:
+        available = _available_memory()
+        return available is not None and available < self.min_available_memory
+
+    def _evict(self) -> None:
+        # never evict the most recently used model, which the caller is about to use
+        while len(self._models) > 1 and (len(self._models) > self.max_size or self._low_memory()):
+            evaluation_model, _ = self._models.popitem(last=False)
+            logger.info(f'Evicted evaluation model {evaluation_model.uri} from cache')
+
+
+model_cache = EvaluationModelCache()
 
 
 available_evaluation_models = {
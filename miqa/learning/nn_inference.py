@@ -1,3 +1,4 @@
+from collections import deque
 import logging
 import math
 
@@ -31,53 +32,63 @@ artifact_names = {
 }
 
 
+def _tile_starts(size, tile_size):
+    # evenly spaced tile origins along one axis; the first and last tiles touch the borders
+    steps = math.ceil(size / tile_size)
+    return [round(step * (size - tile_size) / max(1, steps - 1)) for step in range(steps)]
+
+
 class TiledClassifier(monai.networks.nets.Classifier):
+    def __init__(self, *args, tile_batch_size=8, **kwargs):
+        super().__init__(*args, **kwargs)
+        # how many tiles of each input are pushed through the network in one forward pass
+        self.tile_batch_size = tile_batch_size
+
     def forward(self, inputs):
-        # split the input image into tiles and run each tile through NN
-        results = []
+        # split the input image into tiles and run the tiles through NN in batches
         z_tile_size = self.in_shape[0]
         y_tile_size = self.in_shape[1]
         x_tile_size = self.in_shape[2]
         z_size = inputs.shape[2]
         y_size = inputs.shape[3]
         x_size = inputs.shape[4]
-        z_steps = math.ceil(z_size / z_tile_size)
-        y_steps = math.ceil(y_size / y_tile_size)
-        x_steps = math.ceil(x_size / x_tile_size)
-        for k in range(z_steps):
-            k_start = round(k * (z_size - z_tile_size) / max(1, z_steps - 1))
-            for j in range(y_steps):
-                j_start = round(j * (y_size - y_tile_size) / max(1, y_steps - 1))
-                for i in range(x_steps):
-                    i_start = round(i * (x_size - x_tile_size) / max(1, x_steps - 1))
-
-                    # use slicing operator to make a tile
-                    tile = inputs[
-                        :,
-                        :,
-                        k_start : k_start + z_tile_size,
-                        j_start : j_start + y_tile_size,
-                        i_start : i_start + x_tile_size,
-                    ]
-
-                    # check if the tile is smaller than our NN input
-                    x_pad = max(0, x_tile_size - x_size)
-                    y_pad = max(0, y_tile_size - y_size)
-                    z_pad = max(0, z_tile_size - z_size)
-
-                    if x_pad + y_pad + z_pad > 0:  # we need to pad
-                        tile = torch.nn.functional.pad(
-                            tile, (0, x_pad, 0, y_pad, 0, z_pad), 'replicate'
-                        )
-
-                    results.append(super().forward(tile))
+
+        # check if the image is smaller than our NN input; padding once up front is
+        # equivalent to padding every tile, since such an axis has a single tile
+        x_pad = max(0, x_tile_size - x_size)
+        y_pad = max(0, y_tile_size - y_size)
+        z_pad = max(0, z_tile_size - z_size)
+        if x_pad + y_pad + z_pad > 0:  # we need to pad
+            inputs = torch.nn.functional.pad(inputs, (0, x_pad, 0, y_pad, 0, z_pad), 'replicate')
+
+        # use slicing operator to make the tiles, in the same k, j, i order as a nested loop
+        tiles = [
+            inputs[
+                :,
+                :,
+                k_start : k_start + z_tile_size,
+                j_start : j_start + y_tile_size,
+                i_start : i_start + x_tile_size,
+            ]
+            for k_start in _tile_starts(z_size, z_tile_size)
+            for j_start in _tile_starts(y_size, y_tile_size)
+            for i_start in _tile_starts(x_size, x_tile_size)
+        ]
+
+        results = []
+        batch_size = max(1, self.tile_batch_size)
+        for batch_start in range(0, len(tiles), batch_size):
+            tile_batch = tiles[batch_start : batch_start + batch_size]
+            # tiles x inputs are flattened into one batch and split back apart afterwards
+            outputs = super().forward(torch.cat(tile_batch, dim=0))
+            results.extend(torch.split(outputs, inputs.shape[0], dim=0))
 
         # TODO: do something smarter than mean here
         average = torch.mean(torch.stack(results), dim=0)
         return average
 
 
-def get_model(file_path=None):
+def get_model(file_path=None, tile_batch_size=8):
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
     model = TiledClassifier(
@@ -86,6 +97,7 @@ def get_model(file_path=None):
         channels=(4, 8, 16, 32, 64),
         strides=(2, 2, 2, 2, 2),
         dropout=0.1,
+        tile_batch_size=tile_batch_size,
     )
 
     if file_path is not None:
@@ -306,28 +318,69 @@ def evaluate1(model, image_path):
     return label_results(result)
 
 
-def evaluate_many(model, image_paths):
+def _load_evaluation_image(image_path):
+    # read, reorient and rescale an image into a batch of one, as evaluate1's loader does
+    rescale = ReorientAndRescale(out_min_max=(0, 1))
+    subject = rescale(torchio.Subject({'img': torchio.ScalarImage(image_path)}))
+    return image_path, subject['img'][torchio.DATA].unsqueeze(0)
+
+
+def _prefetch(function, items, num_workers):
+    # apply function to items in order, running ahead of the consumer in num_workers processes
+    if num_workers == 0:
+        yield from map(function, items)
+        return
+    with torch.multiprocessing.Pool(num_workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.apply_async(function, (item,)))
+            if len(pending) >= 2 * num_workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def evaluate_many(model, image_paths, batch_size=1, num_workers=0):
+    """
+    Evaluate many images, returning the labeled results keyed by image path.
+
+    `image_paths` may be any iterable, e.g. a generator yielding files as they finish
+    downloading. Images are read and reoriented by `num_workers` processes while the model runs,
+    and images which end up with the same shape are grouped into batches of up to `batch_size`.
+    At most `batch_size` images are held back waiting for others of their shape.
+    """
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
-    evaluation_files = [
-        torchio.Subject(
-            {
-                'img': torchio.ScalarImage(image_path),
-                'info': torch.FloatTensor([0] * (regression_count + len(artifacts))),
-            }
-        )
-        for image_path in image_paths
-    ]
+    evaluated_paths = []
+    results = {}
+    # bucket images by shape; once a full batch of images is pending, the largest bucket is run
+    # through the model, so mixed shapes never hold more than one batch of images in memory
+    buckets = {}
+    pending = 0
 
-    rescale = ReorientAndRescale(out_min_max=(0, 1))
-    evaluation_ds = monai.data.Dataset(evaluation_files, transform=rescale)
-    evaluation_loader = DataLoader(evaluation_ds, pin_memory=torch.cuda.is_available())
-    results = evaluate_model(model, evaluation_loader, device, None, 0, 'evaluate_many')
+    def evaluate_bucket(shape):
+        paths, inputs = buckets.pop(shape)
+        outputs = model(torch.cat(inputs).to(device))
+        for path, output in zip(paths, outputs.cpu().tolist()):
+            results[path] = output
+        return len(paths)
 
-    labeled_results = {}
-    for index, result in enumerate(results):
-        labeled_results[image_paths[index]] = label_results(result)
-    return labeled_results
+    model.eval()
+    with torch.no_grad():
+        for image_path, inputs in _prefetch(_load_evaluation_image, image_paths, num_workers):
+            evaluated_paths.append(image_path)
+            shape = tuple(inputs.shape[1:])
+            bucket_paths, bucket_inputs = buckets.setdefault(shape, ([], []))
+            bucket_paths.append(image_path)
+            bucket_inputs.append(inputs)
+            pending += 1
+            if pending >= batch_size:
+                largest = max(buckets, key=lambda shape: len(buckets[shape][0]))
+                pending -= evaluate_bucket(largest)
+        for shape in list(buckets.keys()):
+            evaluate_bucket(shape)
+
+    return {image_path: label_results(results[image_path]) for image_path in evaluated_paths}
 
 
 if __name__ == '__main__':
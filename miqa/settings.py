@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from datetime import timedelta
 from pathlib import Path
+import tempfile
 
 from composed_configuration import (
     ComposedConfiguration,
@@ -42,6 +43,31 @@ class MiqaMixin(ConfigMixin):
     NORMAL_USERS_CAN_CREATE_PROJECTS = values.BooleanValue(environ=True, default=False)
     # Enable the following to replace null creation times for scan decisions with import time
     REPLACE_NULL_CREATION_DATETIMES = values.BooleanValue(environ=True, default=False)
+    # Number of CSV rows read and inserted together when importing, bounding memory use
+    IMPORT_CHUNK_SIZE = values.IntegerValue(environ=True, default=10000)
+    # Number of directories (or S3 prefixes) checked concurrently for the files of an import
+    IMPORT_FILE_CHECK_WORKERS = values.IntegerValue(environ=True, default=16)
+    # Enable the following to also check that the S3 objects referenced by an import exist
+    IMPORT_CHECK_S3_FILES = values.BooleanValue(environ=True, default=False)
+    # Number of experiments fetched from the database and written together when exporting
+    EXPORT_CHUNK_SIZE = values.IntegerValue(environ=True, default=100)
+    # Number of frames downloaded, evaluated and saved together when evaluating an import
+    EVALUATION_CHUNK_SIZE = values.IntegerValue(environ=True, default=100)
+    # Local copies of remote frame files are kept here, evicting the least recently used files
+    # once the total size exceeds FRAME_CACHE_MAX_SIZE bytes
+    FRAME_CACHE_DIR = values.Value(
+        environ=True, default=str(Path(tempfile.gettempdir()) / 'miqa-frame-cache')
+    )
+    FRAME_CACHE_MAX_SIZE = values.IntegerValue(environ=True, default=10 * 1024**3)
+    # Number of concurrent S3 downloads while evaluating a chunk of frames
+    S3_DOWNLOAD_WORKERS = values.IntegerValue(environ=True, default=8)
+    # Seconds for which the S3 download URLs of frames are valid
+    S3_PRESIGNED_URL_EXPIRATION = values.IntegerValue(environ=True, default=60 * 60)
+    # Number of same-shaped scans evaluated together by the NN
+    EVALUATION_BATCH_SIZE = values.IntegerValue(environ=True, default=4)
+    # Number of processes reading and reorienting scans while the NN runs. Celery prefork
+    # workers cannot have child processes, so this requires e.g. the threads or solo pool.
+    EVALUATION_LOADER_WORKERS = values.IntegerValue(environ=True, default=0)
 
     # Override default signup sheet to ask new users for first and last name
     ACCOUNT_FORMS = {'signup': 'miqa.core.rest.accounts.AccountSignupForm'}
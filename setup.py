@@ -55,7 +55,6 @@ setup(
         'django-composed-configuration[prod]',
         'django-s3-file-field[boto3]',
         'gunicorn',
-        'schema',
     ],
     extras_require={
         'dev': [
@@ -68,6 +67,8 @@ setup(
             'factory_boy',
             'girder-pytest-pyppeteer==0.0.9',
             'pytest-asyncio',
+            # reference implementation in the import benchmarks
+            'schema',
             'types-dateparser',
         ],
         'learning': [
@@ -84,5 +85,9 @@ setup(
             'spatial_image_ngff',
             'spatial_image_multiscale',
         ],
+        # zstd-compressed (.zst) import and export files
+        'zstd': [
+            'zstandard',
+        ],
     },
 )
@@ -4,7 +4,7 @@ import OAuthClient from '@girder/oauth-client';
 import S3FileFieldClient from 'django-s3-file-field';
 
 import {
-  ResponseData, Project, ProjectTaskOverview, ProjectSettings, User, Email, Experiment, Scan, Frame,
+  ResponseData, ImportExportJob, Project, ProjectTaskOverview, ProjectSettings, User, Email, Experiment, Scan, Frame,
 } from './types';
 import { API_URL, OAUTH_API_ROOT, OAUTH_CLIENT_ID } from './constants';
 
@@ -23,6 +23,36 @@ class ErrorResponseDetail extends Error {
 }
 
 const apiClient = axios.create({ baseURL: API_URL });
+const JOB_POLL_INTERVAL = 1000;
+
+// Imports and exports run in the background; wait for them to finish
+async function waitForJob(job: ImportExportJob): Promise<ResponseData> {
+  let current = job;
+  while (!current.finished) {
+    // eslint-disable-next-line no-await-in-loop
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+    // eslint-disable-next-line no-await-in-loop
+    current = (await apiClient.get(`/jobs/${current.id}`)).data;
+  }
+  if (current.state === 'failed') {
+    throw new ErrorResponseDetail(current.errors.join(' '));
+  }
+  if (current.errors.length > 0) {
+    return {
+      detail: `The following errors occurred during ${current.kind}.`,
+      errors: current.errors,
+      warnings: current.warnings,
+    };
+  }
+  if (current.warnings.length > 0) {
+    return {
+      detail: `The following warnings were raised during ${current.kind}.`,
+      errors: current.errors,
+      warnings: current.warnings,
+    };
+  }
+  return undefined;
+}
 let s3ffClient;
 
 const oauthClient = new OAuthClient(OAUTH_API_ROOT, OAUTH_CLIENT_ID);
@@ -76,20 +106,20 @@ const djangoClient = {
   },
   async globalImport(): Promise<ResponseData> {
     const response = await apiClient.post('/global/import');
-    return response?.data;
+    return waitForJob(response.data);
   },
   async projectImport(projectId: string): Promise<ResponseData> {
     const response = await apiClient.post(`/projects/${projectId}/import`);
-    return response?.data;
+    return waitForJob(response.data);
   },
   async globalExport(): Promise<ResponseData> {
     const response = await apiClient.post('/global/export');
-    return response?.data;
+    return waitForJob(response.data);
   },
   async projectExport(projectId: string): Promise<ResponseData> {
     if (!projectId) return undefined;
     const response = await apiClient.post(`/projects/${projectId}/export`);
-    return response?.data;
+    return waitForJob(response.data);
   },
   async createProject(projectName: string): Promise<Project> {
     if (!projectName) return undefined;
@@ -110,6 +140,14 @@ const djangoClient = {
     const response = await apiClient.get(`/projects/${projectId}`);
     return response?.data;
   },
+  // The project with the review progress of its experiments, but without their scans
+  async projectSummary(projectId: string): Promise<Project> {
+    if (!projectId) return undefined;
+    const response = await apiClient.get(`/projects/${projectId}`, {
+      params: { summary: true },
+    });
+    return response?.data;
+  },
   async projectTaskOverview(projectId: string): Promise<ProjectTaskOverview> {
     if (!projectId) return undefined;
     const response = await apiClient.get(`/projects/${projectId}/task_overview`);
@@ -189,13 +227,25 @@ const djangoClient = {
     const response = await apiClient.delete(`/experiments/${experimentId}`);
     return response?.data;
   },
-  async scans(experimentId: string): Promise<Scan[]> {
+  async scans(experimentId: string, fields?: string[]): Promise<Scan[]> {
     if (!experimentId) return undefined;
     const response = await apiClient.get('/scans', {
-      params: { experiment: experimentId },
+      params: { experiment: experimentId, fields: fields?.join(',') },
     });
     return response?.data?.results;
   },
+  // One page of the scans of an experiment, optionally with only some of their fields
+  async scansPage(
+    experimentId: string, offset: number, limit: number, fields?: string[],
+  ): Promise<Paginated<Partial<Scan>>> {
+    if (!experimentId) return undefined;
+    const response = await apiClient.get('/scans', {
+      params: {
+        experiment: experimentId, offset, limit, fields: fields?.join(','),
+      },
+    });
+    return response?.data;
+  },
   async scan(scanId: string): Promise<Scan> {
     if (!scanId) return undefined;
     const response = await apiClient.get(`/scans/${scanId}`);
@@ -221,6 +271,12 @@ const djangoClient = {
     });
     return response?.data?.results;
   },
+  // The URL to download a frame from storage, or null for frames served by MIQA itself
+  async frameDownloadUrl(frameId: string): Promise<string | null> {
+    if (!frameId) return undefined;
+    const response = await apiClient.get(`/frames/${frameId}/download_url`);
+    return response?.data?.download_url;
+  },
   async frame(frameId: string): Promise<Frame> {
     if (!frameId) return undefined;
     const response = await apiClient.get(`/frames/${frameId}`);
@@ -12,6 +12,21 @@ interface ResponseData {
   id?: string,
 }
 
+interface ImportExportJob {
+  id: string,
+  kind: 'import' | 'export',
+  project: string | null,
+  state: 'pending' | 'running' | 'succeeded' | 'failed',
+  finished: boolean,
+  processed: number,
+  total: number | null,
+  errors: string[],
+  warnings: string[],
+  result: any,
+  created: string,
+  modified: string,
+}
+
 interface User {
   id: number,
   username: string,
@@ -45,6 +60,12 @@ interface Experiment {
   scans?: Scan[],
   project: string,
   note: string,
+  status?: {
+    total_scans: number,
+    total_complete: number,
+    needs_tier_2_review: number,
+    unreviewed: number,
+  },
 }
 
 interface Frame {
@@ -76,6 +97,8 @@ interface Project {
   status: {
     total_scans: number,
     total_complete: number,
+    needs_tier_2_review?: number,
+    unreviewed?: number,
   }
   creator: string;
 }
@@ -205,7 +228,7 @@ interface MIQAStore {
 }
 
 export {
-  User, ResponseData, Project, ProjectTaskOverview, ProjectSettings,
+  User, ResponseData, ImportExportJob, Project, ProjectTaskOverview, ProjectSettings,
   Scan, ScanDecision, Frame, ScanState, Email, Experiment, MIQAConfig,
   WindowLock, MIQAStore,
 };